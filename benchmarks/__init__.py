@@ -0,0 +1 @@
+# Offline benchmarks for the dashboard data paths (run from the repo root with `python -m benchmarks.<name>`).
@@ -0,0 +1,70 @@
+# benchmarks/bench_fees.py
+# Fee history store and percentile sketches (utils/fees.py, utils/sketch.py) on synthetic minutely samples: append
+# cost, storage per sample, range percentile latency (first query builds the day sketches, later ones only merge
+# them), trend latency, memory, and the sketch's error against exact percentiles of the raw samples.
+#
+#   python -m benchmarks.bench_fees [--days 365]
+import argparse
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from utils.fees import PERCENTILES, RECORD, FeeHistory
+
+
+def timed(fn, repeat: int = 1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fee history store / sketch benchmark")
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    n = args.days * 1440
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = np.zeros(n, RECORD)
+    rows["ts"] = start.timestamp() + np.arange(n) * 60.0
+    rng = np.random.default_rng(0)
+    rows["avg_fee"] = rng.lognormal(-14, 0.8, n)
+    rows["fee_24h"] = rng.lognormal(0, 0.3, n)
+    first, last = start.date(), (start + timedelta(days=args.days - 1)).date()
+
+    with tempfile.TemporaryDirectory(prefix="ink-fees-") as tmp:
+        path = Path(tmp) / "samples.f64"
+        path.write_bytes(rows.tobytes())
+        history = FeeHistory(path)
+
+        _, append_ms = timed(lambda: history.record(time.time(), {"avg_fee": 1e-6, "fee_24h": 1.0}))
+        print(f"{len(history):,} samples, {path.stat().st_size / len(history):.0f} bytes/sample on disk, "
+              f"append {append_ms:.3f} ms")
+
+        tracemalloc.start()
+        summary, cold_ms = timed(lambda: history.percentiles(first, last))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        _, warm_ms = timed(lambda: history.percentiles(first, last), repeat=20)
+        _, month_ms = timed(lambda: history.percentiles(last - timedelta(days=29), last), repeat=20)
+        print(f"percentiles over {args.days} days: first {cold_ms:.1f} ms (builds day sketches, peak "
+              f"{peak / 2 ** 20:.1f} MiB), then {warm_ms:.2f} ms; last 30 days {month_ms:.2f} ms")
+        for resolution in ("Daily", "Weekly", "Monthly"):
+            trend, trend_ms = timed(lambda: history.trend(first, last, resolution=resolution), repeat=5)
+            print(f"trend {resolution.lower():<8} {len(trend):>4} buckets in {trend_ms:.2f} ms")
+
+        exact = np.quantile(rows["avg_fee"], PERCENTILES)
+        errors = [abs(summary[f"p{round(q * 100)}"] - e) / e for q, e in zip(PERCENTILES, exact)]
+        stats = history.stats()
+        print("relative error vs exact: " + ", ".join(f"p{round(q * 100)} {err:.2%}" for q, err in zip(PERCENTILES, errors))
+              + f"; sketches hold {stats['sketch_bytes'] / 1024:.0f} KiB for {stats['day_sketches']} days "
+              f"(raw float64 column {rows['avg_fee'].nbytes / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
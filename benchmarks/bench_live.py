@@ -0,0 +1,88 @@
+# benchmarks/bench_live.py
+# Upstream polls made by N sessions watching the live network panel. A local HTTP server stands in for the
+# stats-service (main + transactions pages) and counts requests; each viewer is a thread doing what the page's
+# live fragment does every refresh (watch the shared poller, read the newest sample and the buffered history, build
+# the sparkline cards). With the shared poller the upstream sees ~one poll per URL per interval, however many viewers.
+#
+#   python -m benchmarks.bench_live [--viewers 50] [--seconds 6] [--interval 1]
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.kpi_cards import KpiCard, sparkline_svg
+from utils.live import LiveMetric, LivePoller
+
+
+class Upstream(BaseHTTPRequestHandler):
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with Upstream.lock:
+            Upstream.requests += 1
+        time.sleep(0.05)
+        body = json.dumps({
+            "pending_transactions_30m": {"value": str(random.randint(5, 40))},
+            "average_block_time": {"value": f"{random.uniform(0.9, 1.1):.3f}"},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def viewer(poller: LivePoller, seconds: float, refresh: float, reads: list, render_s: list) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        poller.watch()
+        ts, values = poller.latest()
+        if ts is not None:
+            history = poller.frame()
+            [KpiCard(m, str(values[m]), chart=sparkline_svg(history[m])) for m in values]
+        render_s.append(time.perf_counter() - started)
+        reads.append(1)
+        time.sleep(refresh)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Upstream polls for N live-panel viewers")
+    parser.add_argument("--viewers", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=6)
+    parser.add_argument("--interval", type=float, default=1)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}/stats-service/api/v1/pages"
+    poller = LivePoller("bench", metrics=(
+        LiveMetric("pending_transactions_30m", f"{base}/transactions", "pending_transactions_30m"),
+        LiveMetric("average_block_time", f"{base}/main", "average_block_time"),
+    ), interval=args.interval)
+
+    reads, render_s = [], []
+    threads = [threading.Thread(target=viewer, args=(poller, args.seconds, args.interval, reads, render_s))
+               for _ in range(args.viewers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.shutdown()
+
+    render_s.sort()
+    ideal = 2 * (int(args.seconds / args.interval) + 1)
+    print(f"{args.viewers} viewers, {len(reads)} refreshes -> {Upstream.requests} upstream requests "
+          f"(2 URLs, one poll per interval would be ~{ideal}); {poller.stats()['buffered']} samples buffered")
+    print(f"viewer refresh p50 {render_s[len(render_s) // 2] * 1000:.2f} ms, "
+          f"p99 {render_s[int(len(render_s) * 0.99)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# benchmarks/bench_pages.py
+# End-to-end render benchmark for the Streamlit pages, run headlessly with Streamlit's AppTest against
+# recorded upstream fixtures (benchmarks/data/) and a SQLite stand-in for Snowflake. No network needed.
+#
+#   python -m benchmarks.bench_pages                       # all pages, table output
+#   python -m benchmarks.bench_pages --json bench.json     # also write results
+#   python -m benchmarks.bench_pages --baseline bench.json --tolerance 0.25   # exit 1 on regressions
+#   python -m benchmarks.bench_pages --record              # refresh fixtures from the live upstreams first
+#   python -m benchmarks.bench_pages --fresh               # cold render of each page in its own interpreter
+import argparse
+import functools
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PAGES = {
+    "intro": "📚Intro.py",
+    "contracts": "pages/1_📑Contracts.py",
+    "transactions": "pages/2_⛓Transaction_Analysis.py",
+    "comparison": "pages/3_🌐Superchain_Comparison.py",
+}
+
+# third-party modules worth watching for cold-start cost
+HEAVY_MODULES = ["plotly.express", "plotly.graph_objects", "snowflake.connector", "cryptography", "networkx", "pyarrow"]
+
+# (module, attribute path, phase) - timings are exclusive: time spent in a nested hooked call
+# (e.g. a transform inside a figure builder) is only counted for the inner phase.
+PHASE_HOOKS = [
+    ("utils.loader", "load_page", "fetch"),
+    ("utils.contracts_store", "ContractsStore.append_rows", "parse"),
+    ("utils.contracts_store", "ContractsStore.read_with_version", "parse"),
+    ("utils.timeseries", "DailySeries.merge", "parse"),
+    ("utils.kpi", "RollingKPIEngine.extend", "transform"),
+    ("utils.transforms", "share_frame", "transform"),
+    ("utils.decimate", "bucket_frame", "transform"),
+    ("utils.decimate", "lttb_frame", "transform"),
+    ("utils.figures", "FigureCache.get_or_build", "figure"),
+]
+
+
+# --- Phase timing ----------------------------------------------------------------------------------------------------
+class PhaseTimer:
+    def __init__(self):
+        self.totals: Dict[str, float] = defaultdict(float)
+        self._local = threading.local()
+
+    def reset(self) -> None:
+        self.totals = defaultdict(float)
+
+    def wrap(self, fn, phase: str):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stack = getattr(self._local, "stack", None)
+            if stack is None:
+                stack = self._local.stack = []
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                children = stack.pop()
+                self.totals[phase] += elapsed - children
+                if stack:
+                    stack[-1] += elapsed
+        return wrapper
+
+    def install(self) -> None:
+        for module_name, path, phase in PHASE_HOOKS:
+            owner = importlib.import_module(module_name)
+            *parents, attr = path.split(".")
+            for parent in parents:
+                owner = getattr(owner, parent)
+            setattr(owner, attr, self.wrap(getattr(owner, attr), phase))
+
+
+# --- Environment -----------------------------------------------------------------------------------------------------
+def snowflake_secrets() -> dict:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption()).decode()
+    body = "".join(pem.strip().splitlines()[1:-1])
+    return {"user": "bench", "account": "local", "private_key": body, "warehouse": "", "database": "", "schema": ""}
+
+
+def fresh_process_state(timer: PhaseTimer) -> None:
+    # Forget every app module and point the data directory at an empty temp dir, i.e. a cold worker.
+    for name in [m for m in sys.modules if m == "utils" or m.startswith("utils.")]:
+        del sys.modules[name]
+    os.environ["INK_DATA_DIR"] = tempfile.mkdtemp(prefix="ink-bench-")
+
+    from benchmarks import fixtures, local_snowflake
+
+    http_client = importlib.import_module("utils.http_client")
+    fixtures.install(http_client.get_client().session)
+    local_snowflake.install()
+    # what the worker's Dune job (ingest.py) leaves behind: the pages never sync Dune on the render path
+    dune = importlib.import_module("utils.dune")
+    shared_cache = importlib.import_module("utils.shared_cache")
+    result = dune.get_manager({"api_key": "bench"}).sync("contracts", dune.contracts_sink, force=True)
+    shared_cache.write_dataset("dune_contracts", {"execution_ended_at": result.execution_ended_at})
+    timer.install()
+
+
+# --- Runner ----------------------------------------------------------------------------------------------------------
+def bench_page(name: str, warm_runs: int, secrets: dict, timer: PhaseTimer) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    def new_app():
+        at = AppTest.from_file(str(ROOT / PAGES[name]), default_timeout=120)
+        at.secrets["snowflake"] = secrets
+        at.secrets["dune"] = {"api_key": "bench"}
+        return at
+
+    def timed_run(at) -> float:
+        timer.reset()
+        started = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - started
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].value}")
+        return elapsed
+
+    fresh_process_state(timer)
+    preloaded = set(sys.modules)
+    at = new_app()
+    cold = timed_run(at)
+    cold_phases = dict(timer.totals)
+    lazy = importlib.import_module("utils.lazy")
+    deferred = {name: s * 1e3 for name, s in lazy.import_costs().items()}
+    heavy_loaded = [m for m in HEAVY_MODULES if m in sys.modules and m not in preloaded]
+
+    # peak memory of a cold render (separate pass since tracemalloc slows everything down; modules are
+    # already imported at this point, so this is the render's own allocation peak)
+    fresh_process_state(timer)
+    tracemalloc.start()
+    new_app().run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    warm, warm_phases = [], defaultdict(list)
+    for _ in range(warm_runs):
+        warm.append(timed_run(at))
+        for phase, seconds in timer.totals.items():
+            warm_phases[phase].append(seconds)
+
+    return {
+        "cold_ms": cold * 1e3,
+        "warm_ms": statistics.median(warm) * 1e3 if warm else None,
+        "peak_mib": peak / 2 ** 20,
+        "cold_phases_ms": {p: s * 1e3 for p, s in cold_phases.items()},
+        "warm_phases_ms": {p: statistics.median(v) * 1e3 for p, v in warm_phases.items()},
+        "deferred_imports_ms": deferred,
+        "heavy_modules_loaded": heavy_loaded,
+    }
+
+
+def bench_fresh(page: str, warm_runs: int) -> dict:
+    # Cold numbers are only meaningful for import costs when nothing was imported before: run in a new interpreter.
+    with tempfile.NamedTemporaryFile(suffix=".json") as out:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_pages", "--pages", page, "--warm", str(warm_runs),
+             "--json", out.name, "--quiet"],
+            cwd=ROOT, check=True,
+        )
+        return json.loads(Path(out.name).read_text())[page]
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for page, metrics in results.items():
+        for metric in ("cold_ms", "warm_ms", "peak_mib"):
+            old = baseline.get(page, {}).get(metric)
+            new = metrics.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{page}.{metric}: {old:.1f} -> {new:.1f} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(results: dict) -> None:
+    phases = ["fetch", "parse", "transform", "figure"]
+    header = f"{'page':<13} {'cold ms':>9} {'warm ms':>9} {'peak MiB':>9} | " + " ".join(f"{p:>9}" for p in phases)
+    print(header)
+    print("-" * len(header))
+    for page, r in results.items():
+        cold = " ".join(f"{r['cold_phases_ms'].get(p, 0):>9.1f}" for p in phases)
+        warm = " ".join(f"{r['warm_phases_ms'].get(p, 0):>9.1f}" for p in phases)
+        print(f"{page:<13} {r['cold_ms']:>9.1f} {r['warm_ms'] or 0:>9.1f} {r['peak_mib']:>9.1f} | {cold}  (cold)")
+        print(f"{'':<13} {'':>9} {'':>9} {'':>9} | {warm}  (warm)")
+        if r.get("deferred_imports_ms"):
+            costs = ", ".join(f"{m} {ms:.0f}ms" for m, ms in sorted(r["deferred_imports_ms"].items(), key=lambda kv: -kv[1]))
+            print(f"{'':<13} deferred imports: {costs}")
+        print(f"{'':<13} heavy modules imported by the cold render: {', '.join(r.get('heavy_modules_loaded', [])) or '-'}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline page render benchmark")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--warm", type=int, default=5, help="number of warm reruns per page")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, help="compare against a previous --json output")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (fraction)")
+    parser.add_argument("--fresh", action="store_true", help="run each page in a fresh interpreter (true cold start)")
+    parser.add_argument("--quiet", action="store_true", help=argparse.SUPPRESS)
+    fixtures_group = parser.add_mutually_exclusive_group()
+    fixtures_group.add_argument("--record", action="store_true", help="re-record fixtures from the live upstreams")
+    fixtures_group.add_argument("--synthesize", action="store_true", help="regenerate synthetic fixtures")
+    args = parser.parse_args(argv)
+
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from benchmarks import fixtures
+
+    if args.record:
+        fixtures.record()
+    elif args.synthesize or not (fixtures.FIXTURE_DIR / "dune_contracts.json").exists():
+        fixtures.synthesize()
+
+    if args.fresh:
+        results = {page: bench_fresh(page, args.warm) for page in args.pages}
+    else:
+        timer = PhaseTimer()
+        secrets = snowflake_secrets()
+        results = {page: bench_page(page, args.warm, secrets, timer) for page in args.pages}
+    if not args.quiet:
+        print_table(results)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+# benchmarks/bench_replicas.py
+# Upstream calls made by N app replicas polling the same stats endpoint, per cache backend. A local HTTP server
+# stands in for the stats-service and counts requests; each replica is a separate process running get_json() in a
+# loop, as page reruns would. With the per-process cache every replica refreshes on its own (~N calls per TTL);
+# with a shared backend one replica refreshes and the others reuse its result (~1 call per TTL).
+#
+#   python -m benchmarks.bench_replicas [--replicas 4] [--seconds 6] [--ttl 1]
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY = 0.1
+
+
+class Upstream(BaseHTTPRequestHandler):
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with Upstream.lock:
+            Upstream.requests += 1
+        time.sleep(LATENCY)
+        body = json.dumps({"total_transactions": {"value": str(Upstream.requests)}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def replica(url: str, cache_url: str, seconds: float, ttl: float, out) -> None:
+    os.environ["INK_CACHE_URL"] = cache_url
+    from utils.fetch import get_json
+
+    reads, deadline = 0, time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        get_json(url, ttl=ttl)
+        reads += 1
+        time.sleep(0.02)
+    out.put(reads)
+
+
+def run(backend: str, cache_url: str, replicas: int, seconds: float, ttl: float) -> dict:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/stats-service/api/v1/pages/main"
+    Upstream.requests = 0
+
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=replica, args=(url, cache_url, seconds, ttl, out)) for _ in range(replicas)]
+    for proc in procs:
+        proc.start()
+    reads = sum(out.get() for _ in procs)
+    for proc in procs:
+        proc.join()
+    server.shutdown()
+    return {"backend": backend, "reads": reads, "upstream_calls": Upstream.requests,
+            "ideal": int(seconds / ttl) + 1}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Upstream calls per backend for N replicas")
+    parser.add_argument("--replicas", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=6)
+    parser.add_argument("--ttl", type=float, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ink-replicas-") as tmp:
+        for backend, cache_url in [("local", "local"), ("sqlite", f"sqlite:///{tmp}/cache.sqlite")]:
+            r = run(backend, cache_url, args.replicas, args.seconds, args.ttl)
+            print(f"{r['backend']:<8} {args.replicas} replicas, {r['reads']:>5} reads -> "
+                  f"{r['upstream_calls']:>3} upstream calls (one per TTL would be ~{r['ideal']})")
+
+
+if __name__ == "__main__":
+    main()
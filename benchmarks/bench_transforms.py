@@ -0,0 +1,80 @@
+# benchmarks/bench_transforms.py
+# Micro-benchmark: contracts share computation, pandas column-by-column (the original Chart 3 code)
+# vs utils.transforms.share_frame, on synthetic multi-year daily series.
+#
+#   python -m benchmarks.bench_transforms [--years 1 3 5 10] [--repeat 50]
+import argparse
+import timeit
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from utils.transforms import share_frame
+
+COLUMNS = ["Existing Contracts", "New Contract"]
+
+
+def make_frame(days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Date": pd.date_range("2015-01-01", periods=days, tz="UTC"),
+        "Existing Contracts": rng.integers(0, 50_000, days).astype("float64"),
+        "New Contract": rng.integers(0, 5_000, days).astype("float64"),
+        "Total Contracts": rng.integers(0, 55_000, days).astype("float64"),
+        "Transaction per Contract": rng.random(days),
+        "User per Contract": rng.random(days),
+        "New Contracts Ratio": rng.random(days),
+    })
+    # a few gaps and zero-total days, as in real data
+    df.loc[df.sample(frac=0.01, random_state=seed).index, "New Contract"] = np.nan
+    df.loc[df.sample(frac=0.005, random_state=seed + 1).index, COLUMNS] = 0.0
+    return df
+
+
+def legacy(df: pd.DataFrame) -> pd.DataFrame:
+    norm_df = df.copy()
+    norm_df["Existing Contracts"] = norm_df["Existing Contracts"].fillna(0)
+    norm_df["New Contract"] = norm_df["New Contract"].fillna(0)
+    norm_df["Total"] = norm_df["Existing Contracts"] + norm_df["New Contract"]
+    norm_df["Existing (%)"] = norm_df["Existing Contracts"] / norm_df["Total"]
+    norm_df["New (%)"] = norm_df["New Contract"] / norm_df["Total"]
+    return norm_df
+
+
+def vectorized(df: pd.DataFrame) -> pd.DataFrame:
+    return share_frame(df, COLUMNS, names={"Existing Contracts": "Existing (%)", "New Contract": "New (%)"}, keep=["Date"])
+
+
+def peak_bytes(fn, df) -> int:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = fn(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Share transform micro-benchmark")
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'years':>5} {'rows':>6} | {'legacy ms':>10} {'numpy ms':>9} {'speedup':>7} | {'legacy KiB':>10} {'numpy KiB':>9}")
+    for years in args.years:
+        df = make_frame(365 * years)
+        a, b = legacy(df), vectorized(df)
+        np.testing.assert_allclose(a["Existing (%)"], b["Existing (%)"], equal_nan=True)
+        np.testing.assert_allclose(a["New (%)"], b["New (%)"], equal_nan=True)
+
+        t_legacy = min(timeit.repeat(lambda: legacy(df), number=1, repeat=args.repeat)) * 1e3
+        t_numpy = min(timeit.repeat(lambda: vectorized(df), number=1, repeat=args.repeat)) * 1e3
+        m_legacy = peak_bytes(legacy, df) / 1024
+        m_numpy = peak_bytes(vectorized, df) / 1024
+        print(f"{years:>5} {len(df):>6} | {t_legacy:>10.3f} {t_numpy:>9.3f} {t_legacy / t_numpy:>6.1f}x | {m_legacy:>10.1f} {m_numpy:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
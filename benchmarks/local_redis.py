@@ -0,0 +1,51 @@
+# benchmarks/local_redis.py
+# In-memory stand-in for a Redis client, covering the subset RedisBackend uses (get, set with nx/px, delete and the
+# compare-and-delete release script). Shared by the threads of one process; use the SQLite backend across processes.
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class LocalRedis:
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and time.monotonic() >= expires:
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key: str, value, ex: Optional[float] = None, px: Optional[int] = None, nx: bool = False):
+        if isinstance(value, str):
+            value = value.encode()
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return None
+            ttl = px / 1000 if px is not None else ex
+            self._data[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def eval(self, script: str, numkeys: int, *args) -> int:
+        # only the compare-and-delete script RedisBackend.release sends
+        key, token = args[0], args[1]
+        if isinstance(token, str):
+            token = token.encode()
+        with self._lock:
+            if self._live(key) == token:
+                del self._data[key]
+                return 1
+            return 0
@@ -0,0 +1,90 @@
+# benchmarks/local_snowflake.py
+# Local stand-in for snowflake.connector used by the offline page benchmarks. Connections are backed by
+# an in-memory SQLite database and expose the subset of the connector API the app uses.
+import sqlite3
+import sys
+import threading
+from typing import Iterator, Optional
+
+import pandas as pd
+
+_seed_sql = []
+_lock = threading.Lock()
+
+
+def seed(sql: str) -> None:
+    # SQL run on every new connection (CREATE TABLE / INSERT fixtures)
+    with _lock:
+        _seed_sql.append(sql)
+
+
+class LocalCursor:
+    def __init__(self, conn: sqlite3.Connection):
+        self._cur = conn.cursor()
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def execute(self, sql: str, params=None):
+        self._cur.execute(sql, params or ())
+        return self
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def fetch_pandas_all(self) -> pd.DataFrame:
+        columns = [d[0].upper() for d in self._cur.description]
+        return pd.DataFrame(self._cur.fetchall(), columns=columns)
+
+    def fetch_pandas_batches(self, batch_size: int = 10_000) -> Iterator[pd.DataFrame]:
+        columns = [d[0].upper() for d in self._cur.description]
+        while True:
+            rows = self._cur.fetchmany(batch_size)
+            if not rows:
+                return
+            yield pd.DataFrame(rows, columns=columns)
+
+    def close(self) -> None:
+        self._cur.close()
+
+
+class LocalConnection:
+    def __init__(self):
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        with _lock:
+            for sql in _seed_sql:
+                self._conn.executescript(sql)
+        self._closed = False
+
+    def cursor(self) -> LocalCursor:
+        return LocalCursor(self._conn)
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        self._closed = True
+        self._conn.close()
+
+
+class errors:
+    OperationalError = sqlite3.OperationalError
+    ProgrammingError = sqlite3.ProgrammingError
+
+
+def connect(**kwargs) -> LocalConnection:
+    return LocalConnection()
+
+
+def install(connector_module: Optional[object] = None) -> None:
+    # Route the app's Snowflake connections to the local stand-in without importing the real connector.
+    if connector_module is None:
+        import utils.snowflake_pool
+
+        utils.snowflake_pool.connector = sys.modules[__name__]
+    else:
+        connector_module.connect = connect
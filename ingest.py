@@ -0,0 +1,188 @@
+# ingest.py
+# Background ingestion worker. Polls the upstreams on a schedule and writes normalized datasets into the
+# shared local cache (utils/shared_cache.py) and the contracts store, so page renders never wait on them.
+#
+#   python ingest.py             # run forever
+#   python ingest.py --once      # run every job once and exit
+#   python ingest.py --only stats_main dune_contracts
+#   python ingest.py --snapshot  # rebuild the KPI snapshots from the datasets on disk and exit
+import argparse
+import logging
+import random
+import threading
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+from utils.contracts_store import get_contracts_store
+from utils.dune import DuneManager, contracts_sink, get_manager as get_dune_manager
+from utils.fees import get_fee_history
+from utils.fetch import API_CONTRACTS, API_MAIN, API_TRANSACTIONS
+from utils.http_client import get_client
+from utils.kpi_snapshot import PAGE_SOURCES, refresh_snapshot
+from utils.shared_cache import write_dataset
+from utils.tracing import trace
+
+SECRETS_PATH = Path(__file__).resolve().parent / ".streamlit" / "secrets.toml"
+
+log = logging.getLogger("ingest")
+
+# dataset -> page whose KPI snapshot is derived from it
+SNAPSHOT_PAGES = {dataset: page for page, sources in PAGE_SOURCES.items() for dataset in sources.values()}
+# dataset -> history that records every fetched payload (see utils/fees.py)
+PAYLOAD_SINKS = {"stats_transactions": lambda data, fetched_at: get_fee_history().record_payload(data, fetched_at)}
+
+# --- Jobs ------------------------------------------------------------------------------------------------------------
+@dataclass
+class Job:
+    name: str
+    interval: float                 # seconds between successful polls
+    run: Callable[[], Any]
+    max_backoff: float = 15 * 60
+    failures: int = 0
+    next_run: float = 0.0
+
+    def schedule_success(self, now: float) -> None:
+        self.failures = 0
+        # +-10% jitter keeps jobs from different workers from polling in lockstep
+        self.next_run = now + self.interval * random.uniform(0.9, 1.1)
+
+    def schedule_failure(self, now: float) -> None:
+        self.failures += 1
+        # exponential backoff with jitter, capped at max_backoff
+        cap = min(self.max_backoff, self.interval * 2 ** self.failures)
+        self.next_run = now + random.uniform(cap / 2, cap)
+
+
+def fetch_json(url: str, timeout: float = 15) -> dict:
+    resp = get_client().get(url, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def ingest_dune_contracts(dune: DuneManager) -> dict:
+    # Starts a re-execution when one is due and the credit budget allows, then downloads rows only when Dune has a
+    # newer execution than the one in the store (one page at a time, straight into the Parquet store).
+    dune.maybe_execute("contracts")
+    result = dune.sync("contracts", contracts_sink, force=True)
+    hwm = get_contracts_store().high_water_mark()
+    return {
+        "execution_ended_at": result.execution_ended_at,
+        "downloaded": result.downloaded,
+        "rows_appended": result.ingested or 0,
+        "high_water_mark": hwm.isoformat() if hwm is not None else None,
+        "credits_spent_30d": dune.credits_spent(),
+    }
+
+
+def snowflake_status(pool) -> dict:
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            with trace("snowflake_query", "status"):
+                cur.execute("SELECT CURRENT_ACCOUNT(), CURRENT_WAREHOUSE(), CURRENT_TIMESTAMP()")
+            account, warehouse, server_time = cur.fetchone()
+        finally:
+            cur.close()
+    return {"account": account, "warehouse": warehouse, "server_time": server_time.isoformat()}
+
+
+def load_secrets(path: Path = SECRETS_PATH) -> dict:
+    try:
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def build_jobs(secrets: dict) -> List[Job]:
+    jobs = [
+        Job("stats_main", 60, lambda: fetch_json(API_MAIN)),
+        Job("stats_transactions", 60, lambda: fetch_json(API_TRANSACTIONS)),
+        Job("stats_contracts", 120, lambda: fetch_json(API_CONTRACTS)),
+    ]
+    if "dune" in secrets:
+        dune = get_dune_manager(secrets["dune"])
+        jobs.append(Job("dune_contracts", 15 * 60, lambda: ingest_dune_contracts(dune)))
+    if "snowflake" in secrets:
+        from utils.snowflake_pool import get_pool
+
+        pool = get_pool(secrets["snowflake"], max_size=2)
+        jobs.append(Job("snowflake_status", 5 * 60, lambda: snowflake_status(pool)))
+    return jobs
+
+
+# --- Runner ----------------------------------------------------------------------------------------------------------
+def run_job(job: Job) -> bool:
+    started = time.time()
+    try:
+        data = job.run()
+    except Exception as e:
+        job.schedule_failure(time.time())
+        log.warning("%s failed (%d in a row), retrying in %.0fs: %s",
+                    job.name, job.failures, job.next_run - time.time(), e)
+        return False
+    write_dataset(job.name, data, fetched_at=started)
+    if job.name in PAYLOAD_SINKS:
+        try:
+            PAYLOAD_SINKS[job.name](data, started)
+        except Exception as e:
+            log.warning("%s history append failed: %s", job.name, e)
+    if job.name in SNAPSHOT_PAGES:
+        try:
+            refresh_snapshot(SNAPSHOT_PAGES[job.name])
+        except Exception as e:
+            log.warning("%s snapshot refresh failed: %s", SNAPSHOT_PAGES[job.name], e)
+    job.schedule_success(time.time())
+    log.info("%s ok in %.2fs", job.name, time.time() - started)
+    return True
+
+
+def job_loop(job: Job, stop: threading.Event) -> None:
+    while not stop.is_set():
+        run_job(job)
+        stop.wait(max(0.0, job.next_run - time.time()))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ink Chain dashboard ingestion worker")
+    parser.add_argument("--once", action="store_true", help="run every job once and exit")
+    parser.add_argument("--only", nargs="+", metavar="JOB", help="restrict to these job names")
+    parser.add_argument("--snapshot", action="store_true", help="rebuild the KPI snapshots from the datasets and exit")
+    parser.add_argument("--secrets", type=Path, default=SECRETS_PATH, help="path to the Streamlit secrets.toml")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.snapshot:
+        missing = [page for page in PAGE_SOURCES if not refresh_snapshot(page)]
+        for page in missing:
+            log.warning("%s snapshot not written: source datasets missing (run with --once first)", page)
+        return 1 if missing else 0
+
+    jobs = build_jobs(load_secrets(args.secrets))
+    if args.only:
+        jobs = [job for job in jobs if job.name in args.only]
+
+    if args.once:
+        with ThreadPoolExecutor(max_workers=len(jobs) or 1) as pool:
+            results = list(pool.map(run_job, jobs))
+        return 0 if all(results) else 1
+
+    stop = threading.Event()
+    threads = [threading.Thread(target=job_loop, args=(job, stop), name=job.name, daemon=True) for job in jobs]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        log.info("stopping")
+        stop.set()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
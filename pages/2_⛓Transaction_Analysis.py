@@ -1,10 +1,21 @@
 # inkonchain_main_with_transactions.py
 import streamlit as st
-import requests
-import pandas as pd
-import plotly.express as px
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+
+from utils.fees import get_fee_history
+from utils.fetch import API_MAIN, API_TRANSACTIONS
+from utils.figures import cached_figure, frame_version
+from utils.lazy import lazy_import
+from utils.kpi import get_engine
+from utils.kpi_cards import KpiCard, KpiGrid, inject_kpi_style, sparkline_svg
+from utils.kpi_snapshot import daily_transactions_series, read_snapshot, sync_engine, transactions_values, write_snapshot
+from utils.live import get_poller
+from utils.loader import Source, load_page
+from utils.profiler import render_profiler_panel
+from utils.tracing import start_run, traced_fragment
+
+# plotly loads on first use, i.e. only when the chart is actually (re)built (see utils/lazy.py)
+px = lazy_import("plotly.express")
 
 # --- Page Config ------------------------------------------------------------------------------------------------------
 st.set_page_config(
@@ -13,6 +24,8 @@ st.set_page_config(
     layout="wide"
 )
 
+trace_run = start_run("transactions")
+
 # --- Title & Info ----------------------------------------------------------------------------------------------------
 st.title("📊 Inkonchain Stats")
 
@@ -60,75 +73,6 @@ st.sidebar.markdown(
     unsafe_allow_html=True
 )
 
-# --- API endpoints ---------------------------------------------------------------------------------------------------
-API_MAIN = "https://explorer.inkonchain.com/stats-service/api/v1/pages/main"
-API_TRANSACTIONS = "https://explorer.inkonchain.com/stats-service/api/v1/pages/transactions"
-
-# --- Fetch Data helper -----------------------------------------------------------------------------------------------
-def fetch_json(url: str) -> Optional[dict]:
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        return resp.json()
-    except Exception as e:
-        st.error(f"⚠️ Failed to fetch {url}: {e}")
-        return None
-
-# Fetch both APIs
-data_main = fetch_json(API_MAIN)
-data_tx = fetch_json(API_TRANSACTIONS)
-
-if data_main is None:
-    st.stop()
-
-# --- Extract Key Data from main API ----------------------------------------------------------------------------------
-average_block_time = data_main.get("average_block_time", {}).get("value", "N/A")
-total_addresses = data_main.get("total_addresses", {}).get("value", "N/A")
-total_blocks = data_main.get("total_blocks", {}).get("value", "N/A")
-total_transactions = data_main.get("total_transactions", {}).get("value", "N/A")
-yesterday_transactions = data_main.get("yesterday_transactions", {}).get("value", "N/A")
-
-# Extract daily chart data (assume there is at least some data)
-daily_chart = data_main.get("daily_new_transactions", {}).get("chart", []) or []
-
-# Build DataFrame for the chart (guard against missing/invalid)
-if daily_chart:
-    df_daily = pd.DataFrame(daily_chart)
-    # parse date column might be 'date' or similar; ensure conversion
-    if "date" in df_daily.columns:
-        df_daily["date"] = pd.to_datetime(df_daily["date"])
-    elif "date_from" in df_daily.columns:
-        df_daily["date"] = pd.to_datetime(df_daily["date_from"])
-    else:
-        # fallback: try first column as date
-        df_daily["date"] = pd.to_datetime(df_daily.iloc[:, 0])
-    # value -> int
-    if "value" in df_daily.columns:
-        df_daily["value"] = df_daily["value"].astype(int)
-    else:
-        df_daily["value"] = pd.to_numeric(df_daily.iloc[:, 1], errors="coerce").fillna(0).astype(int)
-
-    # ensure sorted by date
-    df_daily = df_daily.sort_values("date").reset_index(drop=True)
-    # if more than 30 rows, take last 30
-    if len(df_daily) > 30:
-        df_daily = df_daily.iloc[-30:].reset_index(drop=True)
-else:
-    df_daily = pd.DataFrame(columns=["date", "value"])
-
-# --- Extract Key Data from transactions API --------------------------------------------------------------------------
-# data_tx could be None if failed; handle gracefully
-txn_fee_24h_raw = None
-avg_txn_fee_24h_raw = None
-transactions_24h = None
-pending_txns_30m = None
-
-if data_tx:
-    txn_fee_24h_raw = data_tx.get("transactions_fee_24h", {}).get("value")
-    avg_txn_fee_24h_raw = data_tx.get("average_transactions_fee_24h", {}).get("value")
-    transactions_24h = data_tx.get("transactions_24h", {}).get("value")
-    pending_txns_30m = data_tx.get("pending_transactions_30m", {}).get("value")
-
 # --- Utility formatting functions ------------------------------------------------------------------------------------
 def fmt_int(x):
     try:
@@ -142,90 +86,11 @@ def fmt_float_fixed(x, decimals):
     except Exception:
         return x
 
-def pct_change(new, old):
-    try:
-        new_f = float(new)
-        old_f = float(old)
-        if old_f == 0:
-            return None
-        return (new_f - old_f) / old_f * 100.0
-    except Exception:
-        return None
-
-# --- Compute derived KPIs from df_daily --------------------------------------------------------------------------------
-# Defaults
-max_tx_value = None
-max_tx_date = None
-min_tx_value = None
-min_tx_date = None
-mean_tx_30 = None
-pct_1d = None
-pct_7d = None
+def fmt_as_of(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 
-if not df_daily.empty:
-    max_row = df_daily.loc[df_daily["value"].idxmax()]
-    min_row = df_daily.loc[df_daily["value"].idxmin()]
-    max_tx_value = int(max_row["value"])
-    max_tx_date = pd.to_datetime(max_row["date"]).date().isoformat()
-    min_tx_value = int(min_row["value"])
-    min_tx_date = pd.to_datetime(min_row["date"]).date().isoformat()
-    mean_tx_30 = df_daily["value"].mean()
-
-    # percent change 1 day: compare last day vs previous day
-    if len(df_daily) >= 2:
-        last = df_daily["value"].iloc[-1]
-        prev1 = df_daily["value"].iloc[-2]
-        pct_1d = pct_change(last, prev1)
-    else:
-        pct_1d = None
-
-    # percent change 7 day: compare last day vs 7-days-ago (if available)
-    if len(df_daily) >= 8:
-        last = df_daily["value"].iloc[-1]
-        prev7 = df_daily["value"].iloc[-8]
-        pct_7d = pct_change(last, prev7)
-    else:
-        pct_7d = None
-
-# --- KPI Card CSS (same as before, values color #7132f5) ---------------------------------------------------------------
-kpi_style = """
-<style>
-.kpi-card {
-    background-color: #ffffff;
-    border-radius: 15px;
-    padding: 18px 16px;
-    box-shadow: 0 4px 10px rgba(0,0,0,0.05);
-    text-align: center;
-    transition: all 0.22s ease;
-    min-height: 94px;
-}
-.kpi-card:hover {
-    box-shadow: 0 6px 16px rgba(0,0,0,0.12);
-    transform: translateY(-3px);
-}
-.kpi-title {
-    font-size: 14px;
-    font-weight: 600;
-    color: #444444;
-}
-.kpi-value {
-    font-size: 26px;
-    font-weight: 800;
-    color: #7132f5;
-    margin-top: 8px;
-}
-.kpi-desc {
-    font-size: 12px;
-    color: #777777;
-    margin-top: 6px;
-}
-.kpi-small {
-    font-size: 13px;
-    color: #555555;
-}
-</style>
-"""
-st.markdown(kpi_style, unsafe_allow_html=True)
+# --- KPI Card Style (built once per process, injected once per run, see utils/kpi_cards.py) -------------------------
+inject_kpi_style()
 
 # --- Build KPI Grid (12 KPIs in 4 rows x 3 columns) -------------------------------------------------------------------
 st.markdown("---")
@@ -235,106 +100,187 @@ st.subheader("📈 Network & Transaction KPIs")
 # 1-5: from main API (as before)
 # 6-7: from transactions API (two requested)
 # 8-12: derived from 30-day chart (max, min, mean, pct 1d, pct 7d)
+def kpi_cards(v):
+    average_block_time = v["average_block_time"] if v["average_block_time"] is not None else "N/A"
+    txn_fee_24h_raw = v["transactions_fee_24h"]
+    avg_txn_fee_24h_raw = v["average_transactions_fee_24h"]
+    return [KpiCard(**card) for card in [
+        {
+            "title": "Average Block Time",
+            "value": f"{average_block_time} s",
+            "desc": "Average time per block"
+        },
+        {
+            "title": "Total Addresses",
+            "value": fmt_int(v["total_addresses"] if v["total_addresses"] is not None else "N/A"),
+            "desc": "Addresses that participated"
+        },
+        {
+            "title": "Total Blocks",
+            "value": fmt_int(v["total_blocks"] if v["total_blocks"] is not None else "N/A"),
+            "desc": "All blocks produced"
+        },
+        {
+            "title": "Total Transactions",
+            "value": fmt_int(v["total_transactions"] if v["total_transactions"] is not None else "N/A"),
+            "desc": "Total number of transactions (all-time)"
+        },
+        {
+            "title": "Yesterday Transactions",
+            "value": fmt_int(v["yesterday_transactions"] if v["yesterday_transactions"] is not None else "N/A"),
+            "desc": "Transactions (last 24h)"
+        },
+        # Transactions API KPIs (formatting as requested)
+        {
+            "title": "Transactions fees (24h)",
+            "value": fmt_float_fixed(txn_fee_24h_raw if txn_fee_24h_raw is not None else "N/A", 4) + (f" ETH" if txn_fee_24h_raw is not None else ""),
+            "desc": "Sum of ETH spent on gas fees (24h)"
+        },
+        {
+            "title": "Avg. transaction fee (24h)",
+            "value": fmt_float_fixed(avg_txn_fee_24h_raw if avg_txn_fee_24h_raw is not None else "N/A", 10) + (f" ETH" if avg_txn_fee_24h_raw is not None else ""),
+            "desc": "Average gas fee per txn (24h)"
+        },
+        # Derived KPIs from 30-day chart
+        {
+            "title": "Max daily txns (30d)",
+            "value": fmt_int(v["max_tx_value"]) if v["max_tx_value"] is not None else "N/A",
+            "desc": f"Date: {v['max_tx_date']}" if v["max_tx_date"] else "—"
+        },
+        {
+            "title": "Min daily txns (30d)",
+            "value": fmt_int(v["min_tx_value"]) if v["min_tx_value"] is not None else "N/A",
+            "desc": f"Date: {v['min_tx_date']}" if v["min_tx_date"] else "—"
+        },
+        {
+            "title": "Average daily txns",
+            "value": fmt_int(round(v["mean_tx_30"])) if v["mean_tx_30"] is not None else "N/A",
+            "desc": f"Mean over last {v['mean_days']} days" if v["mean_days"] > 0 else "—"
+        },
+        {
+            "title": "Change vs 1d",
+            "value": (f"{v['pct_1d']:+.2f}%" if v["pct_1d"] is not None else "N/A"),
+            "desc": "Percent change vs previous day"
+        },
+        {
+            "title": "Change vs 7d",
+            "value": (f"{v['pct_7d']:+.2f}%" if v["pct_7d"] is not None else "N/A"),
+            "desc": "Percent change vs 7 days ago"
+        },
+    ]]
 
-kpis = [
-    {
-        "title": "Average Block Time",
-        "value": f"{average_block_time} s",
-        "desc": "Average time per block"
-    },
-    {
-        "title": "Total Addresses",
-        "value": fmt_int(total_addresses),
-        "desc": "Addresses that participated"
-    },
-    {
-        "title": "Total Blocks",
-        "value": fmt_int(total_blocks),
-        "desc": "All blocks produced"
-    },
-    {
-        "title": "Total Transactions",
-        "value": fmt_int(total_transactions),
-        "desc": "Total number of transactions (all-time)"
-    },
-    {
-        "title": "Yesterday Transactions",
-        "value": fmt_int(yesterday_transactions),
-        "desc": "Transactions (last 24h)"
-    },
-    # Transactions API KPIs (formatting as requested)
-    {
-        "title": "Transactions fees (24h)",
-        "value": fmt_float_fixed(txn_fee_24h_raw if txn_fee_24h_raw is not None else "N/A", 4) + (f" ETH" if txn_fee_24h_raw is not None else ""),
-        "desc": "Sum of ETH spent on gas fees (24h)"
-    },
-    {
-        "title": "Avg. transaction fee (24h)",
-        "value": fmt_float_fixed(avg_txn_fee_24h_raw if avg_txn_fee_24h_raw is not None else "N/A", 10) + (f" ETH" if avg_txn_fee_24h_raw is not None else ""),
-        "desc": "Average gas fee per txn (24h)"
-    },
-    # Derived KPIs from 30-day chart
-    {
-        "title": "Max daily txns (30d)",
-        "value": fmt_int(max_tx_value) if max_tx_value is not None else "N/A",
-        "desc": f"Date: {max_tx_date}" if max_tx_date else "—"
-    },
-    {
-        "title": "Min daily txns (30d)",
-        "value": fmt_int(min_tx_value) if min_tx_value is not None else "N/A",
-        "desc": f"Date: {min_tx_date}" if min_tx_date else "—"
-    },
-    {
-        "title": "Average daily txns",
-        "value": fmt_int(round(mean_tx_30)) if mean_tx_30 is not None else "N/A",
-        "desc": f"Mean over last {len(df_daily)} days" if len(df_daily) > 0 else "—"
-    },
-    {
-        "title": "Change vs 1d",
-        "value": (f"{pct_1d:+.2f}%" if pct_1d is not None else "N/A"),
-        "desc": "Percent change vs previous day"
-    },
-    {
-        "title": "Change vs 7d",
-        "value": (f"{pct_7d:+.2f}%" if pct_7d is not None else "N/A"),
-        "desc": "Percent change vs 7 days ago"
-    },
+
+# --- Fetch both APIs (worker datasets first, else concurrently, see utils/loader.py) ----------------------------------
+SOURCES = [
+    Source("main", API_MAIN, timeout=15, dataset="stats_main"),
+    Source("transactions", API_TRANSACTIONS, timeout=15, dataset="stats_transactions"),
 ]
+KPI_REFRESH = 60   # seconds between live KPI refreshes; only the fragment below reruns, not the charts
 
-# Render as 4 rows of 3 columns
-idx = 0
-rows = 4
-cols_per_row = 3
-for r in range(rows):
-    cols = st.columns(cols_per_row)
-    for c in range(cols_per_row):
-        if idx >= len(kpis):
-            break
-        k = kpis[idx]
-        with cols[c]:
-            st.markdown(
-                f"""
-                <div class="kpi-card">
-                    <div class="kpi-title">{k['title']}</div>
-                    <div class="kpi-value">{k['value']}</div>
-                    <div class="kpi-desc">{k['desc']}</div>
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-        idx += 1
 
-# --- Daily Transactions Chart (30 days) --------------------------------------------------------------------------------
+@st.fragment(run_every=KPI_REFRESH)
+@traced_fragment("transactions")
+def live_kpis():
+    # The grid is painted from what this session showed last (or the KPI snapshot) before any upstream call, then
+    # repainted in place with live values, and only if they changed (see utils/kpi_cards.py, utils/kpi_snapshot.py).
+    # Returns (page data, daily series or None) to the full run that draws the rest of the page; fragment reruns
+    # discard it.
+    grid = KpiGrid("transactions", columns=3)
+    snapshot = read_snapshot("transactions")
+    if not grid.painted and snapshot is not None:
+        grid.render(kpi_cards(snapshot.values), f"Snapshot as of {fmt_as_of(snapshot.as_of)}, refreshing…")
+
+    page_data = load_page(SOURCES)
+    data_main = page_data.get("main")
+    if data_main is None:
+        if snapshot is not None:
+            grid.render(kpi_cards(snapshot.values),
+                        f"Live data unavailable, showing the snapshot from {fmt_as_of(snapshot.as_of)}.")
+        return page_data, None
+
+    # Daily series and derived KPIs (incremental rolling windows, see utils/kpi.py). The payload's 30-day chart is
+    # merged into the full-history series once per fetch (see utils/timeseries.py).
+    daily_series = daily_transactions_series(data_main, page_data.fetched_at.get("main"))
+    # The engine is shared across sessions and only absorbs days it has not seen yet; stats are memoized per window.
+    kpi_engine = get_engine("daily_transactions")
+    sync_engine(kpi_engine, daily_series)
+
+    kpi_values = transactions_values(data_main, page_data.get("transactions"), kpi_engine)
+    # only written when this data is newer than the stored snapshot (e.g. no worker running)
+    write_snapshot("transactions", kpi_values, {name: page_data.fetched_at[name] for name in page_data.fetched_at})
+    grid.render(kpi_cards(kpi_values))
+    return page_data, daily_series
+
+
+page_data, daily_series = live_kpis()
+for source in SOURCES:
+    if source.name in page_data.errors:
+        st.error(f"⚠️ Failed to fetch {source.url}: {page_data.errors[source.name]}")
+if daily_series is None:
+    st.stop()
+
+# --- Live Network (pending transactions & block time) ----------------------------------------------------------------
+# Short-interval refresh of the fast-moving stats. Every session reads one process-wide poller (one upstream poll per
+# interval however many viewers), and only this fragment reruns; the charts below are untouched (see utils/live.py).
+LIVE_REFRESH = 10
+
 st.markdown("---")
+st.subheader("⚡ Live Network")
 
-if not df_daily.empty:
+
+def live_cards(ts, values, history):
+    as_of = datetime.fromtimestamp(ts, timezone.utc).strftime("%H:%M:%S UTC")
+    pending = values.get("pending_transactions_30m")
+    block_time = values.get("average_block_time")
+    return [
+        KpiCard(
+            title="Pending Transactions (30m)",
+            value=fmt_int(pending) if pending is not None else "N/A",
+            desc=f"Pending in the last 30 minutes · {as_of}",
+            chart=sparkline_svg(history["pending_transactions_30m"]),
+        ),
+        KpiCard(
+            title="Average Block Time",
+            value=f"{fmt_float_fixed(block_time, 2)} s" if block_time is not None else "N/A",
+            desc=f"Average time per block · {as_of}",
+            chart=sparkline_svg(history["average_block_time"], color="#ff7f0e"),
+        ),
+    ]
+
+
+@st.fragment(run_every=LIVE_REFRESH)
+@traced_fragment("transactions")
+def live_network():
+    poller = get_poller("network", interval=LIVE_REFRESH)
+    poller.watch()
+    grid = KpiGrid("transactions_live", columns=2)
+    ts, values = poller.latest()
+    if ts is None:
+        st.caption(f"Live data unavailable: {poller.error}" if poller.error else "Waiting for the first sample…")
+        return
+    grid.render(live_cards(ts, values, poller.frame()))
+
+
+if st.toggle("Live mode", value=False, key="tx_live_mode",
+             help=f"Refresh pending transactions and block time every {LIVE_REFRESH}s"):
+    live_network()
+
+# --- Daily Transactions Chart -----------------------------------------------------------------------------------------
+st.markdown("---")
+
+DAILY_RANGES = {"30 days": 30, "90 days": 90, "1 year": 365, "All": None}
+daily_range = st.select_slider("Range", options=list(DAILY_RANGES), value="30 days", key="tx_daily_range")
+# window views over the stored series, memoized until the next merge
+df_daily = daily_series.window(DAILY_RANGES[daily_range])
+
+def build_daily_chart(theme):
     fig = px.bar(
         df_daily,
         x="date",
         y="value",
         labels={"date": "Date", "value": "Transactions"},
-        title="Daily Transactions (Last 30 Days)",
-        template="plotly_white"
+        title=f"Daily Transactions ({'All Time' if daily_range == 'All' else 'Last ' + daily_range.title()})",
+        template=theme
     )
     # apply purple color and hover formatting
     fig.update_traces(marker_color="#7132f5", hovertemplate="Date: %{x|%Y-%m-%d}<br>Txns: %{y:,}")
@@ -344,7 +290,135 @@ if not df_daily.empty:
         xaxis=dict(tickformat="%b %d"),
         yaxis=dict(tickformat=",")
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+if not df_daily.empty:
+    # figure is rebuilt only when the daily series changes (see utils/figures.py)
+    fig = cached_figure("daily_transactions", (daily_series.version, daily_range), build_daily_chart)
+    st.plotly_chart(fig, width="stretch")
 else:
     st.warning("No daily transaction data available to draw chart.")
 
+# --- Fee Analytics ---------------------------------------------------------------------------------------------------
+# Fee samples (24h fees, average fee per txn) are recorded by the ingestion worker (ingest.py) from every transactions
+# payload it fetches; the page only reads them. Percentiles come from per-day sketches merged over the selected range; no raw samples are held in memory
+# (see utils/fees.py, utils/sketch.py).
+st.markdown("---")
+st.subheader("💸 Fee Analytics")
+
+FEE_METRICS = {
+    "avg_fee": ("Avg. transaction fee", 10),
+    "fee_24h": ("Transactions fees (24h)", 4),
+}
+fee_history = get_fee_history()
+fee_span = fee_history.span()
+if fee_span is None:
+    st.info("No fee samples recorded yet. They are recorded by the ingestion worker: run ingest.py.")
+else:
+    fee_cols = st.columns([2, 1, 1])
+    with fee_cols[0]:
+        fee_range = st.date_input(
+            "Date range",
+            value=(max(fee_span[0], fee_span[1] - timedelta(days=30)), fee_span[1]),
+            min_value=fee_span[0],
+            max_value=fee_span[1],
+            key="fee_range",
+        )
+    with fee_cols[1]:
+        fee_metric = st.selectbox("Metric", list(FEE_METRICS), format_func=lambda m: FEE_METRICS[m][0],
+                                  key="fee_metric")
+    with fee_cols[2]:
+        fee_resolution = st.selectbox("Resolution", ["Daily", "Weekly", "Monthly"], key="fee_resolution")
+
+    if isinstance(fee_range, (tuple, list)) and len(fee_range) == 2:
+        fee_start, fee_end = fee_range
+        fee_label, fee_decimals = FEE_METRICS[fee_metric]
+        fee_summary = fee_history.percentiles(fee_start, fee_end, fee_metric)
+
+        def fee_value(x):
+            return f"{fmt_float_fixed(x, fee_decimals)} ETH" if x is not None else "N/A"
+
+        KpiGrid("fees", columns=4).render([
+            KpiCard("Median (p50)", fee_value(fee_summary["p50"]), fee_label),
+            KpiCard("p90", fee_value(fee_summary["p90"]), fee_label),
+            KpiCard("p99", fee_value(fee_summary["p99"]), fee_label),
+            KpiCard("Samples", fmt_int(fee_summary["samples"]), f"{fee_start} – {fee_end}"),
+        ])
+
+        df_fees = fee_history.trend(fee_start, fee_end, fee_metric, fee_resolution)
+
+        def build_fee_chart(theme):
+            fig = px.line(
+                df_fees,
+                x="date",
+                y=["p50", "p90", "p99"],
+                labels={"date": "Date", "value": f"{fee_label} (ETH)", "variable": "Percentile"},
+                title=f"{fee_label} percentiles ({fee_resolution.lower()})",
+                template=theme,
+                color_discrete_sequence=["#7132f5", "#ff7f0e", "#d62728"],
+            )
+            fig.update_traces(hovertemplate="%{x|%Y-%m-%d}: %{y:.3g} ETH")
+            fig.update_layout(title_x=0, margin=dict(l=20, r=20, t=60, b=40))
+            return fig
+
+        if not df_fees.empty:
+            # rebuilt only when the range gets new samples (once a minute at most) or the selection changes
+            fee_key = (fee_history.version(fee_start, fee_end), fee_start, fee_end, fee_metric, fee_resolution)
+            fig = cached_figure("fee_trend", fee_key, build_fee_chart)
+            st.plotly_chart(fig, width="stretch")
+        else:
+            st.info("No fee samples in the selected range.")
+
+# --- Historical Analytics (Snowflake) --------------------------------------------------------------------------------
+# Opt-in: the connector, the pool and any query are only touched once the toggle is on. Aggregation runs in
+# Snowflake; only one row per day comes back (see utils/snowflake_analytics.py).
+st.markdown("---")
+st.subheader("📅 Historical Transaction Analytics")
+if st.toggle("Load historical analytics from Snowflake", key="tx_history_enabled"):
+    from utils.snowflake_analytics import get_analytics
+    from utils.snowflake_pool import get_pool
+
+    today = date.today()
+    history_range = st.date_input(
+        "Date range",
+        value=(today - timedelta(days=90), today),
+        max_value=today,
+        key="tx_history_range",
+    )
+    if isinstance(history_range, (tuple, list)) and len(history_range) == 2:
+        history_start, history_end = history_range
+        try:
+            analytics = get_analytics(get_pool(st.secrets["snowflake"]), st.secrets["snowflake"])
+            df_history = analytics.daily_activity(history_start, history_end)
+        except Exception as e:
+            st.error(f"⚠️ Snowflake query failed: {e}")
+            df_history = None
+
+        if df_history is not None and not df_history.empty:
+            history_version = frame_version(df_history)
+
+            def build_history_chart(column, title, label, color):
+                def build(theme):
+                    fig = px.line(df_history, x="day", y=column, labels={"day": "Date", column: label},
+                                  title=title, template=theme)
+                    fig.update_traces(line_color=color)
+                    fig.update_layout(title_x=0, margin=dict(l=20, r=20, t=60, b=40))
+                    return fig
+                return build
+
+            hist_cols = st.columns(3)
+            for col, (column, title, label, color) in zip(hist_cols, [
+                ("tx_count", "Daily Transactions", "Transactions", "#7132f5"),
+                ("total_fees", "Daily Fees (ETH)", "Fees (ETH)", "#ff7f0e"),
+                ("active_addresses", "Daily Active Addresses", "Addresses", "#2ca02c"),
+            ]):
+                with col:
+                    fig = cached_figure(f"tx_history_{column}", history_version,
+                                        build_history_chart(column, title, label, color))
+                    st.plotly_chart(fig, width="stretch")
+        elif df_history is not None:
+            st.info("No transactions in the selected range.")
+
+# --- Profiler (hidden, ?profile=1) -------------------------------------------------------------------------------------
+render_profiler_panel(trace_run)
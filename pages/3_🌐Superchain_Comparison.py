@@ -0,0 +1,195 @@
+import html
+
+import streamlit as st
+import pandas as pd
+
+from utils.chains import get_chains, load_chains
+from utils.figures import cached_figure
+from utils.kpi import get_engine
+from utils.kpi_cards import KpiCard, KpiGrid, inject_kpi_style
+from utils.kpi_snapshot import daily_transactions_series, sync_engine, transactions_values
+from utils.lazy import lazy_import
+from utils.profiler import render_profiler_panel
+from utils.tracing import start_run, trace
+
+# plotly loads on first use, i.e. only when the chart is actually (re)built (see utils/lazy.py)
+px = lazy_import("plotly.express")
+
+# --- Page Config ------------------------------------------------------------------------------------------------------
+st.set_page_config(
+    page_title="Superchain Comparison",
+    page_icon="https://explorer.inkonchain.com/assets/configs/network_icon.svg",
+    layout="wide"
+)
+
+trace_run = start_run("comparison")
+
+# --- Title -----------------------------------------------------------------------------------------------------
+st.title("🌐 Superchain Comparison")
+st.caption("Ink next to other Blockscout-based Superchain explorers, from the same stats-service pages.")
+
+# --- Sidebar Footer Slightly Left-Aligned ---------------------------------------------------------------------
+st.sidebar.markdown(
+    """
+    <style>
+    .sidebar-footer {
+        position: fixed;
+        bottom: 20px;
+        width: 250px;
+        font-size: 13px;
+        color: gray;
+        margin-left: 5px; 
+        text-align: left;  
+    }
+    .sidebar-footer img {
+        width: 16px;
+        height: 16px;
+        vertical-align: middle;
+        border-radius: 50%;
+        margin-right: 5px;
+    }
+    .sidebar-footer a {
+        color: gray;
+        text-decoration: none;
+    }
+    </style>
+
+    <div class="sidebar-footer">
+        <div>
+            <a href="https://x.com/inkonchain" target="_blank">
+                <img src="https://explorer.inkonchain.com/assets/configs/network_icon.svg" alt="Ink Logo">
+                Powered by Ink
+            </a>
+        </div>
+        <div style="margin-top: 5px;">
+            <a href="https://x.com/0xeman_raz" target="_blank">
+                <img src="https://pbs.twimg.com/profile_images/1841479747332608000/bindDGZQ_400x400.jpg" alt="Eman Raz">
+                Built by Eman Raz
+            </a>
+        </div>
+    </div>
+    """,
+    unsafe_allow_html=True
+)
+
+# --- Utility formatting functions ------------------------------------------------------------------------------------
+def fmt_int(x):
+    try:
+        return f"{int(x):,}"
+    except Exception:
+        return "N/A"
+
+def fmt_float_fixed(x, decimals):
+    try:
+        return format(float(x), f".{decimals}f")
+    except Exception:
+        return "N/A"
+
+def fmt_pct(x):
+    return f"{x:+.2f}%" if x is not None else "N/A"
+
+# --- Chain selection ---------------------------------------------------------------------------------------------------
+chains = get_chains(st.secrets.get("chains"))
+selected = st.multiselect(
+    "Chains",
+    options=list(chains),
+    default=["ink", "optimism", "base"],
+    format_func=lambda key: chains[key].name,
+    key="compare_chains",
+)
+if not selected:
+    st.info("Select at least one chain.")
+    render_profiler_panel(trace_run)
+    st.stop()
+selected_chains = [chains[key] for key in selected]
+
+# --- Fetch every chain at once (one concurrent batch, cached per chain, see utils/chains.py) -------------------------
+chain_data = load_chains(selected_chains, pages=("main", "transactions"))
+
+values, daily, daily_versions = {}, {}, {}
+for chain in selected_chains:
+    page_data = chain_data[chain.key]
+    for page, error in page_data.errors.items():
+        st.warning(f"⚠️ {chain.name}: failed to fetch {chain.stats_url(page)}: {error}")
+    data_main = page_data.get("main")
+    if data_main is None:
+        continue
+    # one stored series and rolling engine per chain (Ink's are the ones the Transaction Analysis page uses)
+    series_name = "daily_transactions" if chain.key == "ink" else f"daily_transactions_{chain.key}"
+    series = daily_transactions_series(data_main, page_data.fetched_at.get("main"), name=series_name)
+    engine = get_engine(series_name)
+    sync_engine(engine, series)
+    if len(series):
+        daily[chain.key] = series.window(30)
+        daily_versions[chain.key] = series.version
+    values[chain.key] = transactions_values(data_main, page_data.get("transactions"), engine)
+
+# --- Side-by-side KPIs -------------------------------------------------------------------------------------------------
+inject_kpi_style()
+
+st.markdown("---")
+st.subheader("📈 Network KPIs")
+
+KPI_ROWS = [
+    ("Total Transactions", lambda v: fmt_int(v["total_transactions"])),
+    ("Transactions (24h)", lambda v: fmt_int(v["transactions_24h"])),
+    ("Average daily txns (30d)", lambda v: fmt_int(round(v["mean_tx_30"])) if v["mean_tx_30"] is not None else "N/A"),
+    ("Change vs 7d", lambda v: fmt_pct(v["pct_7d"])),
+    ("Total Addresses", lambda v: fmt_int(v["total_addresses"])),
+    ("Average Block Time", lambda v: f"{v['average_block_time']} s" if v["average_block_time"] is not None else "N/A"),
+    ("Avg. transaction fee (24h)", lambda v: fmt_float_fixed(v["average_transactions_fee_24h"], 10) + " ETH"
+        if v["average_transactions_fee_24h"] is not None else "N/A"),
+]
+
+# one KPI grid (one element) per chain column, in the chain's colour; names and colours come from secrets, so the
+# heading is escaped (KpiGrid escapes the cards)
+for col, chain in zip(st.columns(len(selected_chains)), selected_chains):
+    v = values.get(chain.key)
+    with col:
+        st.markdown(f'<div style="font-size:18px;font-weight:800;margin-bottom:12px;text-align:center;'
+                    f'color:{html.escape(chain.color)}">{html.escape(chain.name)}</div>', unsafe_allow_html=True)
+        KpiGrid(f"compare_{chain.key}", columns=1, accent=chain.color).render([
+            KpiCard(title=title, value=fmt(v) if v is not None else "N/A") for title, fmt in KPI_ROWS
+        ])
+
+# --- Overlaid Daily Transactions ---------------------------------------------------------------------------------------
+st.markdown("---")
+st.subheader("📊 Daily Transactions")
+
+if daily:
+    log_scale = st.toggle("Log scale", value=True, key="compare_log_scale",
+                          help="Chains differ by orders of magnitude; a log axis keeps the smaller ones readable.")
+    def build_compare_chart(theme):
+        with trace("dataframe_build", "df_compare"):
+            df_compare = pd.concat(
+                [df.assign(chain=chains[key].name) for key, df in daily.items()], ignore_index=True
+            )
+        fig = px.line(
+            df_compare,
+            x="date",
+            y="value",
+            color="chain",
+            color_discrete_map={chains[key].name: chains[key].color for key in daily},
+            labels={"date": "Date", "value": "Transactions", "chain": "Chain"},
+            title="Daily Transactions (Last 30 Days)",
+            log_y=log_scale,
+            markers=True,
+            template=theme
+        )
+        fig.update_traces(hovertemplate="%{fullData.name}<br>Date: %{x|%Y-%m-%d}<br>Txns: %{y:,}<extra></extra>")
+        fig.update_layout(
+            title_x=0,
+            margin=dict(l=20, r=20, t=60, b=40),
+            xaxis=dict(tickformat="%b %d"),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        return fig
+
+    # rebuilt only when a chain's series, the selection or the scale changes (see utils/figures.py)
+    fig = cached_figure("compare_daily_transactions", (tuple(daily_versions.items()), log_scale), build_compare_chart)
+    st.plotly_chart(fig, width="stretch")
+else:
+    st.warning("No daily transaction data available to draw chart.")
+
+# --- Profiler (hidden, ?profile=1) -------------------------------------------------------------------------------------
+render_profiler_panel(trace_run)
@@ -0,0 +1,262 @@
+# serve.py
+# Headless export API for machine consumers. Serves the KPI values and daily series behind the dashboards straight
+# from the local stores the pages read (KPI snapshots, daily series, contracts store), so downstream jobs never
+# scrape the pages or trigger upstream fetches. Keep the worker (ingest.py) running to keep them fresh.
+#
+#   python serve.py                                  # http://127.0.0.1:8502
+#   GET /health                                      # dataset and snapshot ages
+#   GET /kpis/transactions        /kpis/contracts    # KPI values (JSON, or ?format=csv)
+#   GET /series                                      # available series
+#   GET /series/daily_transactions?start=2025-01-01&end=2025-03-31&format=csv
+#   GET /series/contracts?start=2025-01-01
+#
+# Responses carry an ETag derived from the store version (If-None-Match -> 304 without re-serializing) and are
+# gzip-encoded when the client accepts it.
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from utils.contracts_store import DATE_COL, get_contracts_store
+from utils.kpi_snapshot import PAGE_SOURCES, KpiSnapshot, read_snapshot
+from utils.shared_cache import freshness
+from utils.timeseries import SERIES_DIR, get_series
+
+log = logging.getLogger("serve")
+
+GZIP_MIN_BYTES = 1024
+MAX_AGE = 30                 # Cache-Control max-age (seconds); the worker refreshes every minute at most
+RESPONSE_CACHE_SIZE = 128
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Resources -------------------------------------------------------------------------------------------------------
+def parse_day(params: Dict[str, list], name: str) -> Optional[date]:
+    raw = params.get(name, [None])[0]
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise HttpError(400, f"{name} must be an ISO date (YYYY-MM-DD), got {raw!r}")
+
+
+def series_names() -> list:
+    # a dotted stem is a save still in progress (see DailySeries._save), not a series
+    paths = SERIES_DIR.glob("*.npz") if SERIES_DIR.exists() else []
+    return sorted(path.stem for path in paths if "." not in path.stem) + ["contracts"]
+
+
+def series_version(name: str) -> str:
+    # cheap: a stat (daily series) or the store metadata (contracts); no data is read
+    if name == "contracts":
+        return get_contracts_store().version
+    try:
+        stat = (SERIES_DIR / f"{name}.npz").stat()
+    except FileNotFoundError:
+        raise HttpError(404, f"unknown series {name!r}, see /series")
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def series_frame(name: str, start: Optional[date], end: Optional[date]) -> pd.DataFrame:
+    if name == "contracts":
+        df = get_contracts_store().read()
+        days = df[DATE_COL].dt.tz_localize(None).values.astype("datetime64[D]")
+        lo = 0 if start is None else int(np.searchsorted(days, np.datetime64(start, "D")))
+        hi = len(df) if end is None else int(np.searchsorted(days, np.datetime64(end, "D"), "right"))
+        df = df.iloc[lo:max(lo, hi)].rename(columns=lambda c: c.lower().replace(" ", "_"))
+        return df.rename(columns={DATE_COL.lower(): "date"})
+    with np.load(SERIES_DIR / f"{name}.npz") as raw:
+        dtype = raw["values"].dtype.name
+    return get_series(name, dtype=dtype).between(start, end)
+
+
+def render_series(name: str, start: Optional[date], end: Optional[date], fmt: str) -> Tuple[bytes, str]:
+    df = series_frame(name, start, end)
+    df = df.assign(date=df["date"].dt.strftime("%Y-%m-%d"))
+    if fmt == "csv":
+        return df.to_csv(index=False).encode(), "text/csv; charset=utf-8"
+    head = json.dumps({"name": name, "start": start and start.isoformat(), "end": end and end.isoformat(),
+                       "rows": len(df)})
+    return f'{head[:-1]}, "points": {df.to_json(orient="records")}}}'.encode(), "application/json"
+
+
+def render_kpis(snapshot: KpiSnapshot, fmt: str) -> Tuple[bytes, str]:
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(["key", "value"])
+        writer.writerows((key, "" if value is None else value) for key, value in snapshot.values.items())
+        return out.getvalue().encode(), "text/csv; charset=utf-8"
+    body = {"page": snapshot.page, "as_of": snapshot.as_of, "generated_at": snapshot.generated_at,
+            "sources": snapshot.sources, "values": snapshot.values}
+    return json.dumps(body).encode(), "application/json"
+
+
+# --- Encoded response cache ------------------------------------------------------------------------------------------
+# (etag, gzip) -> body; a repeated request for an unchanged resource costs a dict lookup
+_responses: "OrderedDict[Tuple[str, bool], Tuple[bytes, str]]" = OrderedDict()
+_responses_lock = threading.Lock()
+
+
+def cached_response(etag: str, gzipped: bool, render) -> Tuple[bytes, str]:
+    key = (etag, gzipped)
+    with _responses_lock:
+        hit = _responses.get(key)
+        if hit is not None:
+            _responses.move_to_end(key)
+            return hit
+    body, content_type = render()
+    if gzipped:
+        body = gzip.compress(body, compresslevel=6)
+    with _responses_lock:
+        _responses[key] = (body, content_type)
+        while len(_responses) > RESPONSE_CACHE_SIZE:
+            _responses.popitem(last=False)
+    return body, content_type
+
+
+def make_etag(*parts) -> str:
+    return '"' + hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+# --- HTTP ------------------------------------------------------------------------------------------------------------
+class ExportHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "InkExport/1"
+    # headers and body are separate writes; with Nagle on, keep-alive clients stall ~40 ms on the delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self._handle(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._handle(send_body=False)
+
+    def _handle(self, send_body: bool) -> None:
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        try:
+            self._route([part for part in url.path.split("/") if part], params, send_body)
+        except HttpError as e:
+            self._send_json(e.status, {"error": str(e)}, send_body)
+        except Exception as e:
+            log.exception("%s failed", self.path)
+            self._send_json(500, {"error": str(e)}, send_body)
+        log.debug("%s %s in %.1f ms", self.command, self.path, (time.perf_counter() - started) * 1000)
+
+    def _route(self, parts: list, params: Dict[str, list], send_body: bool) -> None:
+        fmt = params.get("format", [None])[0] or ("csv" if "text/csv" in self.headers.get("Accept", "") else "json")
+        if fmt not in ("json", "csv"):
+            raise HttpError(400, f"format must be json or csv, got {fmt!r}")
+
+        if parts == ["health"]:
+            snapshots = {page: (s.age if (s := read_snapshot(page)) else None) for page in PAGE_SOURCES}
+            return self._send_json(200, {"datasets": freshness(), "snapshots": snapshots}, send_body)
+        if parts == ["series"]:
+            return self._send_json(200, {"series": series_names()}, send_body)
+        if len(parts) == 2 and parts[0] == "kpis":
+            page = parts[1]
+            if page not in PAGE_SOURCES:
+                raise HttpError(404, f"unknown page {page!r}, expected one of {sorted(PAGE_SOURCES)}")
+            snapshot = read_snapshot(page)
+            if snapshot is None:
+                raise HttpError(503, f"no KPI snapshot for {page!r} yet (is ingest.py running?)")
+            etag = make_etag("kpis", page, fmt, snapshot.generated_at)
+            return self._send_cached(etag, lambda: render_kpis(snapshot, fmt), send_body)
+        if len(parts) == 2 and parts[0] == "series":
+            name = parts[1]
+            # only names of existing series reach the stores (and the filesystem)
+            if name not in series_names():
+                raise HttpError(404, f"unknown series {name!r}, see /series")
+            start, end = parse_day(params, "start"), parse_day(params, "end")
+            if start and end and start > end:
+                raise HttpError(400, "start is after end")
+            etag = make_etag("series", name, start, end, fmt, series_version(name))
+            return self._send_cached(etag, lambda: render_series(name, start, end, fmt), send_body)
+        raise HttpError(404, f"no route for {self.path}")
+
+    def _send_cached(self, etag: str, render, send_body: bool) -> None:
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        # one ETag per representation: the gzip variant is a different byte sequence
+        etag = etag[:-1] + '-gz"' if gzipped else etag
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={MAX_AGE}", "Vary": "Accept, Accept-Encoding"}
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            return self._send(304, b"", None, headers, send_body)
+        body, content_type = cached_response(etag, gzipped, render)
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+        self._send(200, body, content_type, headers, send_body)
+
+    def _send_json(self, status: int, payload: dict, send_body: bool) -> None:
+        body = json.dumps(payload).encode()
+        headers = {"Cache-Control": "no-store"}
+        if len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self._send(status, body, "application/json", headers, send_body)
+
+    def _send(self, status: int, body: bytes, content_type: Optional[str], headers: Dict[str, str],
+              send_body: bool) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body and status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        log.info("%s - %s", self.address_string(), format % args)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ink Chain dashboard export API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    server = ThreadingHTTPServer((args.host, args.port), ExportHandler)
+    server.daemon_threads = True
+    log.info("serving on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("stopping")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1 @@
+# Shared data-access helpers used by the Streamlit pages.
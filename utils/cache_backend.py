@@ -0,0 +1,286 @@
+# utils/cache_backend.py
+# Cross-process cache shared by app replicas (and the worker). The in-process caches (utils/fetch.py TTLCache, the
+# Snowflake result LRU) stay in front of it; on a local miss a replica first looks in the shared backend, and only
+# the replica holding the key's refresh lock calls the upstream. The others serve the previous value meanwhile, or
+# wait for the holder when there is none, so N replicas cost one upstream call per TTL instead of N.
+#
+# Selected with INK_CACHE_URL:
+#   (unset) / local               per-process only, the default
+#   sqlite  / sqlite:///<path>    SQLite file on a volume the replicas share (default <data dir>/cache.sqlite;
+#                                 as in SQLAlchemy URLs, sqlite:////abs/path is absolute, sqlite:///rel/path relative)
+#   redis://host:6379/0           Redis (needs the `redis` package)
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+
+from utils.paths import DATA_DIR
+from utils.tracing import record
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+DEFAULT_LOCK_LEASE = 60.0   # seconds a refresh lock is held at most (a crashed holder frees it after this)
+DEFAULT_LOCK_WAIT = 15.0    # seconds a replica waits for another one's refresh when it has nothing to serve
+POLL_INTERVAL = 0.05
+
+
+@dataclass(frozen=True)
+class SharedValue:
+    value: Any
+    fetched_at: float
+
+
+# --- Codecs ----------------------------------------------------------------------------------------------------------
+def encode_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def decode_json(payload: bytes) -> Any:
+    return json.loads(payload)
+
+
+def encode_frame(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False)
+    return buf.getvalue()
+
+
+def decode_frame(payload: bytes) -> pd.DataFrame:
+    return pd.read_parquet(io.BytesIO(payload))
+
+
+# --- Backends --------------------------------------------------------------------------------------------------------
+class CacheBackend:
+    # Per-process no-op: nothing is shared and every lock is granted (the in-process caches already single-flight).
+    shared = False
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        return None
+
+    def set(self, key: str, payload: bytes, fetched_at: float, retain: float) -> None:
+        pass
+
+    def acquire(self, key: str, lease: float = DEFAULT_LOCK_LEASE) -> Optional[str]:
+        return "local"
+
+    def release(self, key: str, token: str) -> None:
+        pass
+
+
+class SQLiteBackend(CacheBackend):
+    # One SQLite file (WAL) on a shared local volume; locks are leases in a table, taken in an IMMEDIATE transaction.
+    shared = True
+
+    def __init__(self, path: Path = DATA_DIR / "cache.sqlite"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries "
+                         "(key TEXT PRIMARY KEY, payload BLOB, fetched_at REAL, expires_at REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, token TEXT, expires_at REAL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        row = self._conn().execute(
+            "SELECT payload, fetched_at FROM entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return (bytes(row[0]), row[1]) if row else None
+
+    def set(self, key: str, payload: bytes, fetched_at: float, retain: float) -> None:
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                     (key, payload, fetched_at, time.time() + retain))
+        # expired rows are dropped on write, so the file doesn't grow with dead keys
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+
+    def acquire(self, key: str, lease: float = DEFAULT_LOCK_LEASE) -> Optional[str]:
+        token = uuid.uuid4().hex
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT expires_at FROM locks WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] > now:
+                conn.execute("COMMIT")
+                return None
+            conn.execute("INSERT OR REPLACE INTO locks VALUES (?, ?, ?)", (key, token, now + lease))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return token
+
+    def release(self, key: str, token: str) -> None:
+        self._conn().execute("DELETE FROM locks WHERE key = ? AND token = ?", (key, token))
+
+
+class RedisBackend(CacheBackend):
+    # Any client with the redis-py get/set/delete/eval API (a local stand-in works for tests and benchmarks).
+    shared = True
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, client: Any = None, url: Optional[str] = None, prefix: str = "ink:"):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("INK_CACHE_URL points at Redis but the `redis` package is not installed")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        raw = self.client.get(f"{self.prefix}v:{key}")
+        if raw is None:
+            return None
+        # 8-byte big-endian epoch-milliseconds header, then the payload
+        return raw[8:], int.from_bytes(raw[:8], "big") / 1000
+
+    def set(self, key: str, payload: bytes, fetched_at: float, retain: float) -> None:
+        stamp = int(fetched_at * 1000).to_bytes(8, "big")
+        self.client.set(f"{self.prefix}v:{key}", stamp + payload, px=max(1, int(retain * 1000)))
+
+    def acquire(self, key: str, lease: float = DEFAULT_LOCK_LEASE) -> Optional[str]:
+        token = uuid.uuid4().hex
+        if self.client.set(f"{self.prefix}l:{key}", token, nx=True, px=int(lease * 1000)):
+            return token
+        return None
+
+    def release(self, key: str, token: str) -> None:
+        # compare-and-delete, so an expired lease never releases the next holder's lock
+        self.client.eval(self.RELEASE_SCRIPT, 1, f"{self.prefix}l:{key}", token)
+
+
+def backend_from_url(url: Optional[str]) -> CacheBackend:
+    if not url or url == "local":
+        return CacheBackend()
+    if url == "sqlite":
+        return SQLiteBackend()
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(Path(url[len("sqlite:///"):]))
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url=url)
+    raise ValueError(f"unsupported INK_CACHE_URL {url!r}")
+
+
+# --- Shared loads ----------------------------------------------------------------------------------------------------
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+_stats = {"shared_hits": 0, "stale_hits": 0, "waits": 0, "upstream_loads": 0, "errors": 0}
+_stats_lock = threading.Lock()
+
+
+def get_backend() -> CacheBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = backend_from_url(os.environ.get("INK_CACHE_URL"))
+        return _backend
+
+
+def set_backend(backend: CacheBackend) -> None:
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def _count(metric: str) -> None:
+    with _stats_lock:
+        _stats[metric] += 1
+
+
+def backend_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        out = dict(_stats)
+    out["backend"] = type(get_backend()).__name__
+    return out
+
+
+@contextmanager
+def shared_lock(key: str, lease: float = DEFAULT_LOCK_LEASE) -> Iterator[bool]:
+    # Non-blocking cross-process lock; yields whether this process got it.
+    backend = get_backend()
+    token = backend.acquire(f"lock:{key}", lease)
+    try:
+        yield token is not None
+    finally:
+        if token is not None:
+            backend.release(f"lock:{key}", token)
+
+
+def load_shared(
+    key: str,
+    loader: Callable[[], Any],
+    ttl: float,
+    retain: Optional[float] = None,
+    encode: Callable[[Any], bytes] = encode_json,
+    decode: Callable[[bytes], Any] = decode_json,
+    wait: float = DEFAULT_LOCK_WAIT,
+) -> SharedValue:
+    # Returns the shared value for `key` if it is younger than `ttl`, else refreshes it (one replica at a time).
+    # Entries are kept `retain` seconds (default 10x ttl) so replicas can serve them while a refresh is running.
+    backend = get_backend()
+    if not backend.shared:
+        return SharedValue(loader(), time.time())
+    retain = 10 * ttl if retain is None else retain
+
+    hit = backend.get(key)
+    if hit is not None and time.time() - hit[1] < ttl:
+        _count("shared_hits")
+        return SharedValue(decode(hit[0]), hit[1])
+
+    token = backend.acquire(key)
+    if token is None:
+        if hit is not None:
+            # another replica is refreshing; serve the previous value meanwhile
+            _count("stale_hits")
+            return SharedValue(decode(hit[0]), hit[1])
+        _count("waits")
+        started = time.perf_counter()
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            fresh = backend.get(key)
+            if fresh is not None:
+                record("cache_wait", time.perf_counter() - started, detail=key)
+                return SharedValue(decode(fresh[0]), fresh[1])
+        record("cache_wait", time.perf_counter() - started, detail=key)
+        # the holder is stuck or failed: load without the lock rather than fail the render
+    try:
+        if token is not None:
+            # someone may have finished a refresh between our read and the lock
+            fresh = backend.get(key)
+            if fresh is not None and time.time() - fresh[1] < ttl:
+                _count("shared_hits")
+                return SharedValue(decode(fresh[0]), fresh[1])
+        fetched_at = time.time()
+        try:
+            value = loader()
+        except Exception:
+            _count("errors")
+            raise
+        _count("upstream_loads")
+        backend.set(key, encode(value), fetched_at, retain)
+        return SharedValue(value, fetched_at)
+    finally:
+        if token is not None:
+            backend.release(key, token)
@@ -0,0 +1,84 @@
+# utils/chains.py
+# Registry of Blockscout-based Superchain explorers. Their stats-service pages (main/transactions/contracts) share
+# one schema, so the same KPIs can be fetched and compared across chains. All chains' pages are fetched in one
+# concurrent batch (see utils/loader.py) and cached per URL, i.e. per chain, in the shared TTL cache; Ink keeps
+# reading the worker datasets.
+#
+# Endpoints can be overridden (or chains added) in secrets.toml:
+#
+#   [chains.base]
+#   name = "Base"
+#   stats_api = "https://base.blockscout.com/stats-service/api/v1/pages"
+#   color = "#0052ff"
+#
+# A chain that isn't built in needs at least `stats_api`.
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from utils.fetch import STATS_API
+from utils.loader import PageData, Source, load_page
+
+STATS_PAGES = ("main", "transactions", "contracts")
+
+
+@dataclass(frozen=True)
+class Chain:
+    key: str
+    name: str
+    stats_api: str                     # base URL of the stats-service pages API
+    color: str                         # series colour in comparison charts
+    datasets: bool = False             # True when the worker (ingest.py) keeps stats_<page> datasets for it
+
+    def stats_url(self, page: str) -> str:
+        return f"{self.stats_api}/{page}"
+
+    def dataset(self, page: str) -> Optional[str]:
+        return f"stats_{page}" if self.datasets else None
+
+
+def _blockscout(host: str) -> str:
+    return f"https://{host}/stats-service/api/v1/pages"
+
+
+CHAINS: Dict[str, Chain] = {chain.key: chain for chain in [
+    Chain("ink", "Ink", STATS_API, "#7132f5", datasets=True),
+    Chain("optimism", "OP Mainnet", _blockscout("optimism.blockscout.com"), "#ff0420"),
+    Chain("base", "Base", _blockscout("base.blockscout.com"), "#0052ff"),
+    Chain("unichain", "Unichain", _blockscout("unichain.blockscout.com"), "#f50db4"),
+    Chain("soneium", "Soneium", _blockscout("soneium.blockscout.com"), "#555555"),
+    Chain("mode", "Mode", _blockscout("explorer.mode.network"), "#b8c800"),
+    Chain("zora", "Zora", _blockscout("explorer.zora.energy"), "#a1723a"),
+]}
+
+
+def get_chains(config: Optional[Mapping] = None) -> Dict[str, Chain]:
+    # The built-in registry with the `[chains.<key>]` overrides from secrets applied.
+    chains = dict(CHAINS)
+    for key, override in (config or {}).items():
+        base = chains.get(key)
+        if base is None:
+            if not override.get("stats_api"):
+                raise ValueError(f"[chains.{key}] is not a built-in chain and needs a stats_api URL")
+            base = Chain(key, override.get("name", key), override["stats_api"], override.get("color", "#888888"))
+        chains[key] = replace(base, **{k: v for k, v in override.items() if k in ("name", "stats_api", "color")})
+    return chains
+
+
+def chain_sources(chains: Iterable[Chain], pages: Iterable[str] = STATS_PAGES, timeout: float = 15) -> List[Source]:
+    return [
+        Source(f"{chain.key}:{page}", chain.stats_url(page), timeout=timeout, dataset=chain.dataset(page))
+        for chain in chains for page in pages
+    ]
+
+
+def load_chains(chains: Iterable[Chain], pages: Iterable[str] = STATS_PAGES, timeout: float = 15) -> Dict[str, PageData]:
+    # One load_page() call for every (chain, page), so N chains cost about as much wall time as one; the result is
+    # split back into one PageData per chain, keyed by page name.
+    chains = list(chains)
+    combined = load_page(chain_sources(chains, pages, timeout))
+    out = {chain.key: PageData() for chain in chains}
+    for attr in ("data", "errors", "timings", "fetched_at"):
+        for name, value in getattr(combined, attr).items():
+            key, page = name.split(":", 1)
+            getattr(out[key], attr)[page] = value
+    return out
@@ -0,0 +1,299 @@
+# utils/contract_graph.py
+# Deployer -> contract <- caller graph for Ink, built from Snowflake edge queries and kept as integer-indexed
+# NumPy edge arrays (addresses are interned once). Degree stats, PageRank and connected components run directly
+# on those arrays; scipy.sparse is used for the heavy metrics when installed. Summaries are cached per hour of data
+# watermark.
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.snowflake_analytics import TransactionsTable, check_identifiers, get_analytics
+from utils.snowflake_pool import SnowflakePool
+from utils.streaming import iter_snowflake_batches
+from utils.tracing import trace
+
+try:
+    from scipy import sparse
+    from scipy.sparse import csgraph
+except ImportError:  # optional: the NumPy paths below compute the same results
+    sparse = csgraph = None
+
+DEPLOY, CALL = 0, 1
+DEFAULT_WINDOW_DAYS = 30
+MAX_CACHED_SUMMARIES = 4
+SUMMARY_GRANULARITY = "1h"   # watermark resolution a summary is keyed on
+
+
+@dataclass(frozen=True)
+class ContractsTable:
+    name: str = "INK.CORE.DIM_CONTRACTS"
+    address_col: str = "ADDRESS"
+    creator_col: str = "CREATOR_ADDRESS"
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "ContractsTable":
+        table = cls(
+            name=config.get("contracts_table", cls.name),
+            address_col=config.get("contracts_address_col", cls.address_col),
+            creator_col=config.get("contracts_creator_col", cls.creator_col),
+        )
+        check_identifiers(table.name, table.address_col, table.creator_col)
+        return table
+
+
+DEPLOY_EDGES_SQL = """
+SELECT {creator} AS src, {address} AS dst, 1 AS weight
+FROM {contracts}
+WHERE {creator} IS NOT NULL
+"""
+
+CALL_EDGES_SQL = """
+SELECT t.{sender} AS src, t.{receiver} AS dst, COUNT(*) AS weight
+FROM {transactions} t
+JOIN {contracts} c ON c.{address} = t.{receiver}
+WHERE t.{ts} >= %(start)s
+GROUP BY 1, 2
+"""
+
+
+# --- Graph storage ---------------------------------------------------------------------------------------------------
+@dataclass
+class ContractGraph:
+    labels: np.ndarray      # node id -> address
+    src: np.ndarray         # int32
+    dst: np.ndarray         # int32
+    weight: np.ndarray      # float64
+    kind: np.ndarray        # int8, DEPLOY or CALL
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.labels)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.src)
+
+    def edges(self, kind: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        mask = self.kind == kind
+        return self.src[mask], self.dst[mask], self.weight[mask]
+
+
+class GraphBuilder:
+    # Interns addresses to dense int ids chunk by chunk; only the int32/float64 edge arrays grow with the data.
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._chunks: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+
+    def _node_ids(self, addresses: pd.Series) -> np.ndarray:
+        ids = self._ids
+        return np.fromiter((ids.setdefault(a, len(ids)) for a in addresses), dtype=np.int32, count=len(addresses))
+
+    def add_edges(self, chunk: pd.DataFrame, kind: int) -> None:
+        chunk = chunk.dropna(subset=["src", "dst"])
+        if chunk.empty:
+            return
+        src = self._node_ids(chunk["src"].astype(str).str.lower())
+        dst = self._node_ids(chunk["dst"].astype(str).str.lower())
+        weight = pd.to_numeric(chunk["weight"], errors="coerce").fillna(1.0).to_numpy(dtype=np.float64)
+        self._chunks.append((src, dst, weight, np.full(len(src), kind, dtype=np.int8)))
+
+    def build(self) -> ContractGraph:
+        labels = np.array(list(self._ids), dtype=object)   # ids are assigned in insertion order
+        if not self._chunks:
+            empty = np.empty(0, dtype=np.int32)
+            return ContractGraph(labels, empty, empty, np.empty(0), np.empty(0, dtype=np.int8))
+        src, dst, weight, kind = (np.concatenate(parts) for parts in zip(*self._chunks))
+        self._chunks = []
+        return ContractGraph(labels, src, dst, weight, kind)
+
+
+# --- Metrics ---------------------------------------------------------------------------------------------------------
+def top_deployers(graph: ContractGraph, n: int = 10) -> pd.DataFrame:
+    src, _, _ = graph.edges(DEPLOY)
+    counts = np.bincount(src, minlength=graph.n_nodes)
+    top = np.argsort(counts)[::-1][:n]
+    top = top[counts[top] > 0]
+    return pd.DataFrame({"deployer": graph.labels[top], "contracts": counts[top]})
+
+
+def hub_contracts(graph: ContractGraph, n: int = 10) -> pd.DataFrame:
+    # call edges are aggregated per (caller, contract), so in-degree == distinct callers
+    _, dst, weight = graph.edges(CALL)
+    callers = np.bincount(dst, minlength=graph.n_nodes)
+    calls = np.bincount(dst, weights=weight, minlength=graph.n_nodes)
+    top = np.argsort(callers)[::-1][:n]
+    top = top[callers[top] > 0]
+    return pd.DataFrame({"contract": graph.labels[top], "callers": callers[top], "calls": calls[top].astype(np.int64)})
+
+
+def pagerank(graph: ContractGraph, alpha: float = 0.85, tol: float = 1e-6, max_iter: int = 100) -> np.ndarray:
+    # Weighted PageRank over all edges; dangling mass is spread uniformly (same convention as networkx).
+    n = graph.n_nodes
+    if n == 0:
+        return np.empty(0)
+    src, dst, weight = graph.src, graph.dst, graph.weight
+    out_weight = np.bincount(src, weights=weight, minlength=n)
+    dangling = out_weight == 0
+    norm = weight / out_weight[src]
+    if sparse is not None:
+        transition = sparse.csr_matrix((norm, (dst, src)), shape=(n, n))
+        step = transition.dot
+    else:
+        def step(r: np.ndarray) -> np.ndarray:
+            return np.bincount(dst, weights=r[src] * norm, minlength=n)
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new = alpha * (step(rank) + rank[dangling].sum() / n) + (1 - alpha) / n
+        err = np.abs(new - rank).sum()
+        rank = new
+        if err < n * tol:
+            break
+    return rank
+
+
+def connected_components(graph: ContractGraph) -> Tuple[int, np.ndarray]:
+    # Weakly connected components; returns (count, component label per node).
+    n = graph.n_nodes
+    if sparse is not None:
+        adjacency = sparse.csr_matrix((np.ones(graph.n_edges), (graph.src, graph.dst)), shape=(n, n))
+        return csgraph.connected_components(adjacency, directed=True, connection="weak")
+
+    # min-label propagation with pointer jumping
+    labels = np.arange(n)
+    src, dst = graph.src, graph.dst
+    while True:
+        low = np.minimum(labels[src], labels[dst])
+        new = labels.copy()
+        np.minimum.at(new, src, low)
+        np.minimum.at(new, dst, low)
+        while True:
+            jumped = new[new]
+            if np.array_equal(jumped, new):
+                break
+            new = jumped
+        if np.array_equal(new, labels):
+            break
+        labels = new
+    roots, labels = np.unique(labels, return_inverse=True)
+    return len(roots), labels
+
+
+@dataclass(frozen=True)
+class GraphSummary:
+    nodes: int
+    edges: int
+    deploy_edges: int
+    call_edges: int
+    components: int
+    largest_component: int
+    top_deployers: pd.DataFrame
+    hub_contracts: pd.DataFrame
+    top_pagerank: pd.DataFrame
+
+
+def summarize(graph: ContractGraph, top: int = 10) -> GraphSummary:
+    with trace("kpi_compute", "contract_graph"):
+        rank = pagerank(graph)
+        order = np.argsort(rank)[::-1][:top]
+        n_components, labels = connected_components(graph)
+        sizes = np.bincount(labels) if graph.n_nodes else np.zeros(1, dtype=np.int64)
+        deploy_edges = int((graph.kind == DEPLOY).sum())
+        return GraphSummary(
+            nodes=graph.n_nodes,
+            edges=graph.n_edges,
+            deploy_edges=deploy_edges,
+            call_edges=graph.n_edges - deploy_edges,
+            components=n_components,
+            largest_component=int(sizes.max()),
+            top_deployers=top_deployers(graph, top),
+            hub_contracts=hub_contracts(graph, top),
+            top_pagerank=pd.DataFrame({"address": graph.labels[order], "pagerank": rank[order]}),
+        )
+
+
+# --- Loading from Snowflake ------------------------------------------------------------------------------------------
+def build_from_chunks(deploy_chunks: Iterable[pd.DataFrame], call_chunks: Iterable[pd.DataFrame]) -> ContractGraph:
+    builder = GraphBuilder()
+    with trace("dataframe_build", "contract_graph"):
+        for chunk in deploy_chunks:
+            builder.add_edges(chunk, DEPLOY)
+        for chunk in call_chunks:
+            builder.add_edges(chunk, CALL)
+        return builder.build()
+
+
+def load_graph(pool: SnowflakePool, transactions: TransactionsTable, contracts: ContractsTable,
+               start: pd.Timestamp) -> ContractGraph:
+    names = dict(
+        contracts=contracts.name, address=contracts.address_col, creator=contracts.creator_col,
+        transactions=transactions.name, sender=transactions.from_col, receiver=transactions.to_col,
+        ts=transactions.timestamp_col,
+    )
+    return build_from_chunks(
+        iter_snowflake_batches(pool, DEPLOY_EDGES_SQL.format(**names)),
+        iter_snowflake_batches(pool, CALL_EDGES_SQL.format(**names), {"start": start.to_pydatetime()}),
+    )
+
+
+# --- Cached summaries (rebuilt when the transactions watermark moves to a new hour) ---------------------------------
+# Per-key single flight, as in utils/fetch.py's TTLCache: one build per key at a time, and while a newer watermark's
+# rebuild runs in the background every caller keeps getting the previous summary. Only a key's first build is waited on.
+_summaries: Dict[Tuple, Tuple[pd.Timestamp, GraphSummary]] = {}   # key -> (watermark, summary)
+_inflight: Dict[Tuple, Future] = {}
+_summaries_lock = threading.Lock()
+_rebuilder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph-summary")
+
+
+def _build_summary(key: Tuple, pool: SnowflakePool, transactions: TransactionsTable, contracts: ContractsTable,
+                   window_days: int, top: int, watermark: pd.Timestamp, flight: Future) -> None:
+    try:
+        start = watermark.tz_localize(None).normalize() - timedelta(days=window_days)
+        summary = summarize(load_graph(pool, transactions, contracts, start), top)
+    except Exception as e:
+        with _summaries_lock:
+            _inflight.pop(key, None)
+        flight.set_exception(e)
+        return
+    with _summaries_lock:
+        _summaries.pop(key, None)
+        _summaries[key] = (watermark, summary)
+        while len(_summaries) > MAX_CACHED_SUMMARIES:
+            _summaries.pop(next(iter(_summaries)))
+        _inflight.pop(key, None)
+    flight.set_result(summary)
+
+
+def get_graph_summary(pool: SnowflakePool, config: Mapping[str, Any], window_days: int = DEFAULT_WINDOW_DAYS,
+                      top: int = 10) -> Optional[GraphSummary]:
+    # Returns None when the transactions table is empty.
+    transactions = TransactionsTable.from_config(config)
+    contracts = ContractsTable.from_config(config)
+    watermark = get_analytics(pool, config).watermark()
+    if watermark is None:
+        return None
+    # new transactions land every few seconds; a graph over a 30-day window only needs rebuilding hourly
+    watermark = watermark.floor(SUMMARY_GRANULARITY)
+    key = (id(pool), transactions, contracts, window_days, top)
+    with _summaries_lock:
+        cached = _summaries.get(key)
+        if cached is not None and cached[0] >= watermark:
+            return cached[1]
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = Future()
+        if cached is not None:
+            # serve the previous summary; the rebuild (if this caller started it) runs off the render path
+            if leader:
+                _rebuilder.submit(_build_summary, key, pool, transactions, contracts, window_days, top, watermark,
+                                  flight)
+            return cached[1]
+    if leader:
+        _build_summary(key, pool, transactions, contracts, window_days, top, watermark, flight)
+    return flight.result()
@@ -0,0 +1,189 @@
+# utils/contracts_store.py
+# On-disk columnar (Parquet) snapshot of the Dune contracts time series (query 6178301).
+# Rows are appended only past the stored high-water mark, so each refresh parses just the new days;
+# pages read back typed, date-sorted columns. The current (still incomplete) UTC day is kept in a small
+# tail file that is replaced on every refresh instead of advancing the high-water mark.
+# The worker and the app processes may both append, so writes hold a file lock on the store directory and every
+# file is written under a unique name and published by the meta.json swap; files it replaces are deleted only
+# after the swap, so a reader holding the previous meta never finds its tail rewritten underneath it.
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.file_lock import file_lock
+from utils.paths import DATA_DIR
+from utils.tracing import traced
+
+DATE_COL = "Date"
+NUMERIC_COLS = [
+    "Existing Contracts",
+    "New Contract",
+    "Total Contracts",
+    "Transaction per Contract",
+    "User per Contract",
+    "New Contracts Ratio",
+]
+MAX_PARTS = 16   # compact into a single file once this many part files exist
+
+
+def normalize_rows(rows: Iterable[dict]) -> pd.DataFrame:
+    df = pd.DataFrame(list(rows))
+    if df.empty:
+        return pd.DataFrame({DATE_COL: pd.Series(dtype="datetime64[ns, UTC]"), **{c: pd.Series(dtype="float64") for c in NUMERIC_COLS}})
+    df[DATE_COL] = pd.to_datetime(df[DATE_COL], utc=True)
+    for col in NUMERIC_COLS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64") if col in df.columns else float("nan")
+    return df[[DATE_COL] + NUMERIC_COLS].sort_values(DATE_COL).reset_index(drop=True)
+
+
+class ContractsStore:
+    def __init__(self, root: Path = DATA_DIR / "contracts"):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._frame: Optional[pd.DataFrame] = None
+        self._frame_version: Optional[str] = None
+
+    # --- Metadata ----------------------------------------------------------------------------------------------------
+    @property
+    def _meta_path(self) -> Path:
+        return self.root / "meta.json"
+
+    def _read_meta(self) -> dict:
+        try:
+            return json.loads(self._meta_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {"high_water_mark": None, "rows": 0, "parts": [], "tail": None, "tail_rev": 0}
+
+    def _write_meta(self, meta: dict) -> None:
+        tmp = self._meta_path.with_suffix(f".{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self._meta_path)
+
+    def _write_frame(self, df: pd.DataFrame, name: str) -> None:
+        tmp = self.root / f"{name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, self.root / name)
+
+    def high_water_mark(self) -> Optional[pd.Timestamp]:
+        hwm = self._read_meta()["high_water_mark"]
+        return pd.Timestamp(hwm) if hwm else None
+
+    @staticmethod
+    def _tail(meta: dict) -> List[str]:
+        # stores written before the tail got a unique name used a fixed one
+        tail = meta.get("tail", "tail.parquet")
+        return [tail] if tail else []
+
+    @staticmethod
+    def _version(meta: dict) -> str:
+        return f"{meta['high_water_mark']}:{meta['rows']}:{meta.get('tail_rev', 0)}"
+
+    @property
+    def version(self) -> str:
+        return self._version(self._read_meta())
+
+    # --- Writes ------------------------------------------------------------------------------------------------------
+    def append_rows(self, rows: List[dict], source_token: Optional[str] = None) -> int:
+        return self.append_chunks([rows], source_token=source_token)
+
+    @traced("dataframe_build")
+    def append_chunks(self, chunks: Iterable[List[dict]], source_token: Optional[str] = None) -> int:
+        # Only rows strictly newer than the high-water mark are typed and written; returns how many were appended.
+        # source_token (e.g. Dune's execution_ended_at) lets repeated calls with the same payload return immediately,
+        # without pulling any chunk. Chunks are filtered one at a time, so only the new rows are ever held together.
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock, file_lock(self.root / "store.lock"):
+            meta = self._read_meta()
+            if source_token is not None and meta.get("source_token") == source_token:
+                return 0
+            hwm = pd.Timestamp(meta["high_water_mark"]) if meta["high_water_mark"] else None
+
+            frames = []
+            for rows in chunks:
+                if hwm is not None and rows:
+                    dates = pd.to_datetime(pd.Series([r.get(DATE_COL) for r in rows]), utc=True)
+                    rows = [r for r, keep in zip(rows, (dates > hwm).tolist()) if keep]
+                if rows:
+                    frames.append(normalize_rows(rows))
+            if not frames:
+                meta["source_token"] = source_token
+                self._write_meta(meta)
+                return 0
+
+            new = pd.concat(frames, ignore_index=True).sort_values(DATE_COL, kind="stable").reset_index(drop=True)
+            today = pd.Timestamp.now(tz="UTC").normalize()
+            complete = new[new[DATE_COL] < today]
+            provisional = new[new[DATE_COL] >= today]
+
+            if not complete.empty:
+                part_name = f"part-{uuid.uuid4().hex}.parquet"
+                self._write_frame(complete, part_name)
+                meta["parts"].append(part_name)
+                meta["rows"] += len(complete)
+                meta["high_water_mark"] = complete[DATE_COL].iloc[-1].isoformat()
+                if len(meta["parts"]) > MAX_PARTS:
+                    meta = self._compact(meta)
+
+            old_tail = self._tail(meta)
+            meta["tail"] = f"tail-{uuid.uuid4().hex}.parquet"
+            self._write_frame(provisional, meta["tail"])
+            meta["tail_rev"] = meta.get("tail_rev", 0) + 1
+            meta["source_token"] = source_token
+            self._write_meta(meta)
+            for name in old_tail:
+                (self.root / name).unlink(missing_ok=True)
+            return len(new)
+
+    def _compact(self, meta: dict) -> dict:
+        df = self._read_parts(meta["parts"])
+        name = f"compact-{uuid.uuid4().hex}.parquet"
+        self._write_frame(df, name)
+        old, meta["parts"] = meta["parts"], [name]
+        # publish the compacted file before the parts it replaces are removed
+        self._write_meta(meta)
+        for part in old:
+            (self.root / part).unlink(missing_ok=True)
+        return meta
+
+    # --- Reads -------------------------------------------------------------------------------------------------------
+    def _read_parts(self, parts: List[str]) -> pd.DataFrame:
+        # a file a writer has since replaced may vanish mid-read; read_with_version notices the new meta and retries
+        frames = []
+        for part in parts:
+            try:
+                frames.append(pd.read_parquet(self.root / part))
+            except FileNotFoundError:
+                continue
+        if not frames:
+            return normalize_rows([])
+        return pd.concat(frames, ignore_index=True).sort_values(DATE_COL, kind="stable").reset_index(drop=True)
+
+    @traced("dataframe_build")
+    def read_with_version(self) -> Tuple[pd.DataFrame, str]:
+        # The decoded frame is kept in memory until the on-disk version changes. Treat it as read-only.
+        with self._lock:
+            meta = self._read_meta()
+            version = self._version(meta)
+            while self._frame is None or self._frame_version != version:
+                frame = self._read_parts(meta["parts"] + self._tail(meta))
+                # another process may have appended (or compacted the parts away) meanwhile: read again
+                meta = self._read_meta()
+                if self._version(meta) == version:
+                    self._frame, self._frame_version = frame, version
+                version = self._version(meta)
+            return self._frame, version
+
+    def read(self) -> pd.DataFrame:
+        return self.read_with_version()[0]
+
+
+_store = ContractsStore()
+
+
+def get_contracts_store() -> ContractsStore:
+    return _store
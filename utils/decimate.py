@@ -0,0 +1,78 @@
+# utils/decimate.py
+# Point-count reduction for long time-series charts: Largest-Triangle-Three-Buckets (LTTB) for line traces
+# and calendar bucketing (weekly/monthly) for bar traces, so chart payloads stay bounded as history grows.
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_POINTS = 800   # roughly the pixel width of a half-width chart
+
+RESOLUTIONS = ["Auto", "Daily", "Weekly", "Monthly"]
+_FREQ = {"Daily": None, "Weekly": "W-MON", "Monthly": "MS"}
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    # Indices of the points LTTB keeps; x must be increasing and y free of NaNs.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    out = np.empty(threshold, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point) is the third triangle vertex
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        if i + 2 < len(edges):
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def lttb_frame(df: pd.DataFrame, x: str, y: str, max_points: int = DEFAULT_MAX_POINTS) -> pd.DataFrame:
+    # Decimate one line trace; returns the kept rows of [x, y].
+    series = df[[x, y]].dropna()
+    if len(series) <= max_points:
+        return series
+    xs = series[x]
+    if pd.api.types.is_datetime64_any_dtype(xs):
+        xs = (xs - xs.iloc[0]).dt.total_seconds()
+    xs = xs.to_numpy()
+    idx = lttb_indices(xs, series[y].to_numpy(), max_points)
+    return series.iloc[idx]
+
+
+def resolve_resolution(resolution: str, n_points: int, max_points: int = DEFAULT_MAX_POINTS) -> str:
+    # "Auto" picks the finest calendar bucket that fits within max_points bars.
+    if resolution != "Auto":
+        return resolution
+    if n_points <= max_points:
+        return "Daily"
+    if n_points / 7 <= max_points:
+        return "Weekly"
+    return "Monthly"
+
+
+def bucket_frame(df: pd.DataFrame, date_col: str, columns: Sequence[str], resolution: str,
+                 agg: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    # Aggregate bar columns into calendar buckets (mean per bucket unless agg says otherwise).
+    freq = _FREQ[resolution]
+    if freq is None:
+        return df[[date_col] + list(columns)]
+    how = {col: (agg or {}).get(col, "mean") for col in columns}
+    out = df.set_index(date_col)[list(columns)].resample(freq, label="left", closed="left").agg(how)
+    return out.dropna(how="all").reset_index()
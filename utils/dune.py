@@ -0,0 +1,276 @@
+# utils/dune.py
+# Dune integration: query ids and the API key come from secrets ([dune] in secrets.toml), and result rows are only
+# downloaded when Dune reports an execution newer than the one already ingested. Freshness is checked with a
+# one-row request at most every `check_interval` seconds per query, shared across processes through a small state
+# file, so most page renders cost zero Dune calls. Optional scheduled re-executions are capped by a rolling
+# 30-day credit budget.
+#
+#   [dune]
+#   api_key = "..."
+#   monthly_credit_budget = 0        # credits re-executions may spend per 30 days (0 = never re-execute)
+#   credits_per_execution = 10       # estimate used when Dune doesn't report the cost
+#
+#   [dune.queries.contracts]
+#   query_id = 6178301
+#   execute_every = 86400            # seconds between re-executions (omit to only read the latest results)
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional
+
+from utils.cache_backend import shared_lock
+from utils.contracts_store import get_contracts_store
+from utils.file_lock import file_lock
+from utils.http_client import HttpClient, get_client
+from utils.paths import DATA_DIR
+from utils.streaming import dune_rows, iter_dune_pages
+
+DUNE_API = "https://api.dune.com/api/v1"
+DEFAULT_QUERIES = {"contracts": 6178301}
+DEFAULT_CHECK_INTERVAL = 10 * 60
+DEFAULT_CREDITS_PER_EXECUTION = 10
+BUDGET_WINDOW = 30 * 86400
+TERMINAL_STATES = ("QUERY_STATE_COMPLETED", "QUERY_STATE_FAILED", "QUERY_STATE_CANCELLED", "QUERY_STATE_EXPIRED")
+STATE_PATH = DATA_DIR / "dune" / "state.json"
+
+
+def results_url(query_id: int) -> str:
+    return f"{DUNE_API}/query/{query_id}/results"
+
+
+@dataclass(frozen=True)
+class DuneQuery:
+    name: str
+    query_id: int
+    execute_every: Optional[float] = None
+    performance: str = "medium"
+
+
+@dataclass(frozen=True)
+class SyncResult:
+    query: str
+    checked: bool                     # False: skipped, checked recently (by any process)
+    downloaded: bool                  # True: a new execution's rows were fetched and ingested
+    execution_ended_at: Optional[str]
+    ingested: Any = None              # whatever the sink returned
+
+
+class DuneManager:
+    def __init__(
+        self,
+        api_key: str,
+        queries: Mapping[str, DuneQuery],
+        monthly_credit_budget: float = 0,
+        credits_per_execution: float = DEFAULT_CREDITS_PER_EXECUTION,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        client: Optional[HttpClient] = None,
+        state_path=STATE_PATH,
+    ):
+        self.queries = dict(queries)
+        self.monthly_credit_budget = monthly_credit_budget
+        self.credits_per_execution = credits_per_execution
+        self.check_interval = check_interval
+        self.state_path = state_path
+        self._client = client or get_client()
+        # sent as a header so the key never ends up in URLs, logs or trace details
+        self._headers = {"X-Dune-API-Key": api_key}
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self._background: Dict[str, Future] = {}
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], **kwargs) -> "DuneManager":
+        raw = config.get("queries") or {name: {"query_id": qid} for name, qid in DEFAULT_QUERIES.items()}
+        queries = {
+            name: DuneQuery(name, int(q["query_id"]), q.get("execute_every"), q.get("performance", "medium"))
+            for name, q in raw.items()
+        }
+        return cls(
+            config["api_key"],
+            queries,
+            monthly_credit_budget=float(config.get("monthly_credit_budget", 0)),
+            credits_per_execution=float(config.get("credits_per_execution", DEFAULT_CREDITS_PER_EXECUTION)),
+            check_interval=float(config.get("check_interval", DEFAULT_CHECK_INTERVAL)),
+            **kwargs,
+        )
+
+    # --- Persistent state (shared with other processes) --------------------------------------------------------------
+    def _read_state(self) -> dict:
+        try:
+            return json.loads(self.state_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {"queries": {}, "ledger": []}
+
+    def _update_state(self, name: Optional[str] = None, ledger_entry: Optional[list] = None, **fields) -> dict:
+        # read-modify-write under a file lock: the worker and the app processes both update the state
+        with self._lock, file_lock(self.state_path.with_name("state.lock")):
+            state = self._read_state()
+            if name is not None:
+                state["queries"].setdefault(name, {}).update(fields)
+            if ledger_entry is not None:
+                state["ledger"].append(ledger_entry)
+            cutoff = time.time() - BUDGET_WINDOW
+            state["ledger"] = [entry for entry in state["ledger"] if entry[0] >= cutoff]
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(state))
+            os.replace(tmp, self.state_path)
+            return state
+
+    def query_state(self, name: str) -> dict:
+        return self._read_state()["queries"].get(name, {})
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[bool]:
+        # One sync or execution decision at a time across threads, processes on this host (file lock) and replicas
+        # (shared backend); non-blocking, yields whether this caller got it. A single lock for every query, since
+        # the credit budget is shared and a sync must not race an execution of the same query.
+        if not self._busy.acquire(blocking=False):
+            yield False
+            return
+        try:
+            with file_lock(self.state_path.with_name("run.lock"), blocking=False) as held:
+                if not held:
+                    yield False
+                    return
+                with shared_lock("dune") as acquired:
+                    yield acquired
+        finally:
+            self._busy.release()
+
+    # --- API calls ---------------------------------------------------------------------------------------------------
+    def _get(self, path: str, timeout: float = 15, **params) -> dict:
+        resp = self._client.get(f"{DUNE_API}{path}", headers=self._headers, params=params or None, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def latest_execution(self, name: str) -> dict:
+        # One-row request: only the execution metadata is of interest.
+        meta = self._get(f"/query/{self.queries[name].query_id}/results", limit=1)
+        meta.pop("result", None)
+        return meta
+
+    def result_pages(self, name: str, timeout: float = 60) -> Iterator[dict]:
+        return iter_dune_pages(results_url(self.queries[name].query_id), self._client, timeout=timeout,
+                               headers=self._headers)
+
+    # --- Sync: download only new executions --------------------------------------------------------------------------
+    def sync(self, name: str, sink: Callable[[Iterator[dict], str], Any], force: bool = False) -> SyncResult:
+        # `sink(pages, execution_ended_at)` ingests the result pages (e.g. into the contracts store).
+        state = self.query_state(name)
+        if not force and time.time() - state.get("checked_at", 0) < self.check_interval:
+            return SyncResult(name, False, False, state.get("execution_ended_at"))
+        with self._exclusive() as acquired:
+            if not acquired:
+                # another thread, process or replica is on it
+                return SyncResult(name, False, False, state.get("execution_ended_at"))
+            return self._sync(name, sink, force)
+
+    def sync_in_background(self, name: str, sink: Callable[[Iterator[dict], str], Any]) -> Optional[Future]:
+        # For the pages: the same sync on a background thread, at most one in flight per query in this process, so a
+        # render never waits on Dune. Returns None when a sync is already running or the check isn't due.
+        if time.time() - self.query_state(name).get("checked_at", 0) < self.check_interval:
+            return None
+        with self._lock:
+            running = self._background.get(name)
+            if running is not None and not running.done():
+                return None
+            future = self._background[name] = _background.submit(self.sync, name, sink)
+        return future
+
+    def syncing(self, name: str) -> bool:
+        future = self._background.get(name)
+        return future is not None and not future.done()
+
+    def background_error(self, name: str) -> Optional[BaseException]:
+        # the failure of the last finished background sync of `name`, if it failed
+        future = self._background.get(name)
+        return future.exception() if future is not None and future.done() else None
+
+    def _sync(self, name: str, sink: Callable[[Iterator[dict], str], Any], force: bool) -> SyncResult:
+        # re-read under the lock: the replica that just released it may have synced already
+        state = self.query_state(name)
+        if not force and time.time() - state.get("checked_at", 0) < self.check_interval:
+            return SyncResult(name, False, False, state.get("execution_ended_at"))
+        meta = self.latest_execution(name)
+        ended_at = meta.get("execution_ended_at")
+        if ended_at is None or ended_at == state.get("execution_ended_at"):
+            self._update_state(name, checked_at=time.time())
+            return SyncResult(name, True, False, state.get("execution_ended_at"))
+        ingested = sink(self.result_pages(name), ended_at)
+        self._update_state(name, checked_at=time.time(), execution_id=meta.get("execution_id"),
+                           execution_ended_at=ended_at)
+        return SyncResult(name, True, True, ended_at, ingested)
+
+    # --- Scheduled re-executions within the credit budget ------------------------------------------------------------
+    def credits_spent(self) -> float:
+        cutoff = time.time() - BUDGET_WINDOW
+        return sum(credits for ts, credits in self._read_state()["ledger"] if ts >= cutoff)
+
+    def maybe_execute(self, name: str) -> Optional[str]:
+        # Starts a re-execution when one is due and affordable; returns its execution id. Completed executions are
+        # picked up by the next sync() since the latest results then carry a newer execution_ended_at.
+        query = self.queries[name]
+        if not query.execute_every:
+            return None
+        with self._exclusive() as acquired:
+            # the ledger check and the execute are one critical section, so two processes can't both book a cost or
+            # start (and pay for) an execution the budget only covers once
+            if not acquired:
+                return None
+            return self._maybe_execute(name, query)
+
+    def _maybe_execute(self, name: str, query: DuneQuery) -> Optional[str]:
+        state = self.query_state(name)
+        pending = state.get("pending_execution_id")
+        if pending:
+            status = self._get(f"/execution/{pending}/status")
+            finished = status.get("is_execution_finished")
+            if finished is None:
+                finished = status.get("state") in TERMINAL_STATES
+            if not finished:
+                return None
+            # book the actual cost when Dune reports it, correcting the estimate booked at submission
+            actual = status.get("execution_cost_credits")
+            if actual is not None:
+                self._update_state(ledger_entry=[time.time(), float(actual) - self.credits_per_execution])
+            self._update_state(name, pending_execution_id=None, checked_at=0)
+            return None
+        if time.time() - state.get("last_executed_at", 0) < query.execute_every:
+            return None
+        if self.credits_spent() + self.credits_per_execution > self.monthly_credit_budget:
+            return None
+        # not retried: a retry after a lost response could start (and pay for) a second execution
+        resp = self._client.request("POST", f"{DUNE_API}/query/{query.query_id}/execute", headers=self._headers,
+                                    json={"performance": query.performance}, timeout=30, retries=0)
+        resp.raise_for_status()
+        execution_id = resp.json().get("execution_id")
+        self._update_state(name, ledger_entry=[time.time(), self.credits_per_execution],
+                           pending_execution_id=execution_id, last_executed_at=time.time())
+        return execution_id
+
+
+# --- Sinks -----------------------------------------------------------------------------------------------------------
+def contracts_sink(pages: Iterator[dict], execution_ended_at: str) -> int:
+    # Dune contracts series -> Parquet store, one page at a time (see ContractsStore.append_chunks).
+    return get_contracts_store().append_chunks(dune_rows(pages), source_token=execution_ended_at)
+
+
+# --- Process-wide managers -------------------------------------------------------------------------------------------
+_managers: Dict[str, DuneManager] = {}
+_background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dune-sync")
+_managers_lock = threading.Lock()
+
+
+def get_manager(config: Mapping[str, Any]) -> DuneManager:
+    key = json.dumps(dict(config), sort_keys=True, default=str)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = DuneManager.from_config(config)
+            _managers[key] = manager
+    return manager
@@ -0,0 +1,213 @@
+# utils/fees.py
+# Fee history behind the Transaction Analysis fee analytics. The ingestion worker (ingest.py) records each
+# stats-service `transactions` payload it fetches, so samples come at the worker's fixed cadence (not weighted by page
+# views), as one fixed-width float64 record (fetch time, 24h fees, average fee per txn) appended to
+# data/fees/samples.f64. Reads memory-map the file, so raw samples are never loaded as Python objects or kept in
+# memory; ranges are found by binary search on the (append-ordered) timestamp column. Percentiles come from one
+# DDSketch per UTC day and metric (utils/sketch.py), built on first use and memoized in an LRU of MAX_DAY_SKETCHES
+# days (only the current day is rebuilt as samples arrive); any range or trend bucket is answered by merging day
+# sketches.
+import os
+import threading
+from collections import OrderedDict
+from itertools import groupby
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.kpi_snapshot import stat_value
+from utils.paths import DATA_DIR
+from utils.sketch import DEFAULT_RELATIVE_ACCURACY, DDSketch, merge_all
+from utils.tracing import traced
+
+try:
+    import fcntl
+except ImportError:   # not on Windows; appends are then only serialized within the process
+    fcntl = None
+
+FEES_DIR = DATA_DIR / "fees"
+# metric -> stat key in the stats-service transactions payload
+FEE_METRICS = {"fee_24h": "transactions_fee_24h", "avg_fee": "average_transactions_fee_24h"}
+RECORD = np.dtype([("ts", "<f8")] + [(metric, "<f8") for metric in FEE_METRICS])
+PERCENTILES = (0.5, 0.9, 0.99)
+DAY = 86400
+MAX_DAY_SKETCHES = 400   # memoized days (over a year); days beyond that are re-read from the map when selected
+MIN_SAMPLE_GAP = 30   # seconds; closer samples (e.g. from a second worker) are dropped, keeping about one per minute
+# trend resolution -> pandas period (weeks start on Monday)
+RESOLUTION_PERIOD = {"Daily": "D", "Weekly": "W-SUN", "Monthly": "M"}
+
+
+def _day(value: Any) -> int:
+    # date / datetime / timestamp -> days since the epoch (UTC)
+    if isinstance(value, (int, float, np.floating)):
+        return int(value // DAY)
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype("int64"))
+
+
+class FeeHistory:
+    def __init__(self, path: Path = FEES_DIR / "samples.f64", relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.path = Path(path)
+        self.relative_accuracy = relative_accuracy
+        self._lock = threading.Lock()
+        self._map: Optional[np.ndarray] = None
+        self._size = -1
+        # day -> (records seen for that day, {metric: sketch}), least recently used first; a day is final once a later
+        # day has samples
+        self._days: "OrderedDict[int, Tuple[int, Dict[str, DDSketch]]]" = OrderedDict()
+
+    # --- Storage -----------------------------------------------------------------------------------------------------
+    def _samples(self) -> np.ndarray:
+        # Read-only memory map of the whole log, re-mapped when the file grows (another process may append).
+        # Must be called with the lock held.
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        size -= size % RECORD.itemsize   # ignore a torn trailing record
+        if size != self._size:
+            self._map = np.memmap(self.path, RECORD, mode="r", shape=(size // RECORD.itemsize,)) if size else \
+                np.empty(0, RECORD)
+            self._size = size
+        return self._map
+
+    def record(self, ts: float, values: Dict[str, Any]) -> bool:
+        # Appends one sample; returns False for a sample less than MIN_SAMPLE_GAP after the last one or without any
+        # fee value.
+        row = np.zeros(1, RECORD)
+        row["ts"] = ts
+        for metric in FEE_METRICS:
+            try:
+                row[metric] = float(values.get(metric))
+            except (TypeError, ValueError):
+                row[metric] = np.nan
+        if all(np.isnan(row[metric][0]) for metric in FEE_METRICS):
+            return False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)   # cross-process: the check and the append are one step
+                size = os.fstat(fd).st_size
+                whole = size - size % RECORD.itemsize
+                if whole:
+                    os.lseek(fd, whole - RECORD.itemsize, os.SEEK_SET)
+                    if ts < np.frombuffer(os.read(fd, RECORD.itemsize), RECORD)["ts"][0] + MIN_SAMPLE_GAP:
+                        return False
+                if whole != size:
+                    os.ftruncate(fd, whole)
+                os.write(fd, row.tobytes())
+            finally:
+                os.close(fd)   # also releases the flock
+        return True
+
+    def record_payload(self, data_tx: Optional[dict], fetched_at: Optional[float]) -> bool:
+        if not data_tx:
+            return False
+        return self.record(fetched_at or time.time(),
+                           {metric: stat_value(data_tx, key) for metric, key in FEE_METRICS.items()})
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples())
+
+    def version(self, start: Any, end: Any) -> int:
+        # Samples in [start, end] (dates, inclusive): only changes when that range gets new samples, so past ranges
+        # keep their key. Use as a cache key for figures built from this history.
+        with self._lock:
+            ts = self._samples()["ts"]
+            lo, hi = np.searchsorted(ts, [_day(start) * DAY, (_day(end) + 1) * DAY])
+            return int(hi - lo)
+
+    def span(self) -> Optional[Tuple[date, date]]:
+        # first and last sample day (UTC)
+        with self._lock:
+            samples = self._samples()
+            if not len(samples):
+                return None
+            first, last = samples["ts"][0], samples["ts"][-1]
+        return (datetime.fromtimestamp(first, timezone.utc).date(), datetime.fromtimestamp(last, timezone.utc).date())
+
+    # --- Day sketches ------------------------------------------------------------------------------------------------
+    def _day_sketches(self, first: int, last: int) -> Dict[int, Dict[str, DDSketch]]:
+        # Sketches for the days in [first, last] that have samples; only days never seen (or still receiving
+        # samples) are read from the map, one contiguous slice per day.
+        with self._lock:
+            samples = self._samples()
+            ts = samples["ts"]
+            if not len(ts):
+                return {}
+            first, last = max(first, _day(ts[0])), min(last, _day(ts[-1]))
+            if first > last:
+                return {}
+            # day boundaries, found by binary search on the mapped timestamps
+            edges = np.searchsorted(ts, np.arange(first, last + 2, dtype="float64") * DAY)
+            out = {}
+            for i, day in enumerate(range(first, last + 1)):
+                lo, hi = int(edges[i]), int(edges[i + 1])
+                if lo == hi:
+                    continue
+                cached = self._days.get(day)
+                if cached is None or cached[0] != hi - lo:
+                    chunk = samples[lo:hi]
+                    sketches = {}
+                    for metric in FEE_METRICS:
+                        sketch = DDSketch(self.relative_accuracy)
+                        sketch.add(chunk[metric])
+                        sketches[metric] = sketch
+                    cached = self._days[day] = (hi - lo, sketches)
+                self._days.move_to_end(day)
+                out[day] = cached[1]
+            while len(self._days) > MAX_DAY_SKETCHES:
+                self._days.popitem(last=False)
+            return out
+
+    @traced("transform")
+    def percentiles(self, start: Any, end: Any, metric: str = "avg_fee",
+                    qs: Sequence[float] = PERCENTILES) -> Dict[str, Any]:
+        # Range summary (start and end inclusive, as dates) from the merged day sketches.
+        sketch = merge_all((s[metric] for s in self._day_sketches(_day(start), _day(end)).values()),
+                           self.relative_accuracy)
+        return {"samples": sketch.count, "mean": sketch.mean,
+                **{f"p{round(q * 100)}": value for q, value in sketch.quantiles(qs).items()}}
+
+    @traced("transform")
+    def trend(self, start: Any, end: Any, metric: str = "avg_fee", resolution: str = "Daily",
+              qs: Sequence[float] = PERCENTILES) -> pd.DataFrame:
+        # One row per day / week / month bucket with samples: ["date", "samples", "mean", "p50", "p90", "p99"].
+        # Weekly and monthly buckets merge their day sketches, so they are exact percentiles of the bucket (within
+        # the sketch accuracy), not percentiles of daily percentiles.
+        days = self._day_sketches(_day(start), _day(end))
+        columns = ["date", "samples", "mean"] + [f"p{round(q * 100)}" for q in qs]
+        if not days:
+            return pd.DataFrame(columns=columns)
+        ordered = sorted(days)
+        buckets = pd.to_datetime(np.array(ordered, "datetime64[D]")).to_period(RESOLUTION_PERIOD[resolution]).start_time
+        rows: List[list] = []
+        for bucket, group in groupby(zip(buckets, ordered), key=lambda pair: pair[0]):
+            group = [day for _, day in group]
+            sketch = days[group[0]][metric] if len(group) == 1 else \
+                merge_all((days[day][metric] for day in group), self.relative_accuracy)
+            rows.append([bucket, sketch.count, sketch.mean] + list(sketch.quantiles(qs).values()))
+        return pd.DataFrame(rows, columns=columns)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"samples": len(self._samples()), "bytes": self._size, "day_sketches": len(self._days),
+                    "sketch_bytes": sum(s.nbytes for _, sketches in self._days.values() for s in sketches.values())}
+
+
+_history: Optional[FeeHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_fee_history() -> FeeHistory:
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = FeeHistory()
+        return _history
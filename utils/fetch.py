@@ -0,0 +1,170 @@
+# utils/fetch.py
+# Shared, TTL-cached fetch layer for the explorer stats-service (and any other JSON endpoint).
+# The cache lives at module level, so every Streamlit session in the process shares it.
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from utils.cache_backend import SharedValue, load_shared
+from utils.http_client import get_client
+from utils.tracing import trace
+
+# --- Endpoints -------------------------------------------------------------------------------------------------------
+STATS_API = "https://explorer.inkonchain.com/stats-service/api/v1/pages"
+API_MAIN = f"{STATS_API}/main"
+API_TRANSACTIONS = f"{STATS_API}/transactions"
+API_CONTRACTS = f"{STATS_API}/contracts"
+
+DEFAULT_TTL = 60          # seconds an entry is considered fresh
+DEFAULT_STALE_TTL = 600   # extra seconds a stale entry may still be served while it refreshes
+DEFAULT_TIMEOUT = 15
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    fetched_at: float
+    ttl: float
+
+    def age(self, now: float) -> float:
+        return now - self.fetched_at
+
+
+class TTLCache:
+    """Per-key TTL cache with single-flight misses and stale-while-revalidate refreshes."""
+
+    def __init__(self, default_ttl: float = DEFAULT_TTL, stale_ttl: float = DEFAULT_STALE_TTL, max_workers: int = 4):
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._entries: Dict[str, CacheEntry] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cache-refresh")
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "errors": 0}
+
+    # --- Internal helpers --------------------------------------------------------------------------------------------
+    def _run(self, key: str, loader: Callable[[], Any], ttl: float, flight: Future) -> None:
+        try:
+            value = loader()
+            fetched_at = time.time()
+            if isinstance(value, SharedValue):
+                # loaded through the cross-process cache: keep the original fetch time so the TTL isn't extended
+                value, fetched_at = value.value, value.fetched_at
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+                self._inflight.pop(key, None)
+            flight.set_exception(e)
+            return
+        with self._lock:
+            self._entries[key] = CacheEntry(value=value, fetched_at=fetched_at, ttl=ttl)
+            self._inflight.pop(key, None)
+        flight.set_result(value)
+
+    def _start_flight(self, key: str) -> Optional[Future]:
+        # must be called with the lock held; returns a new future only if this caller leads the flight
+        if key in self._inflight:
+            return None
+        flight = Future()
+        self._inflight[key] = flight
+        return flight
+
+    # --- Public API --------------------------------------------------------------------------------------------------
+    def get(self, key: str, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.age(now) < entry.ttl:
+                self._stats["hits"] += 1
+                return entry.value
+
+            if entry is not None and entry.age(now) < entry.ttl + self.stale_ttl:
+                # serve stale, refresh in the background (at most one refresh per key)
+                self._stats["stale_hits"] += 1
+                flight = self._start_flight(key)
+                if flight is not None:
+                    self._stats["refreshes"] += 1
+                    self._refresher.submit(self._run, key, loader, ttl, flight)
+                return entry.value
+
+            self._stats["misses"] += 1
+            flight = self._start_flight(key)
+            if flight is None:
+                self._stats["coalesced"] += 1
+                flight = self._inflight[key]
+                leader = False
+            else:
+                leader = True
+
+        if leader:
+            self._run(key, loader, ttl, flight)
+        return flight.result()
+
+    def put(self, key: str, value: Any, fetched_at: float, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.fetched_at <= fetched_at:
+                self._entries[key] = CacheEntry(value=value, fetched_at=fetched_at, ttl=ttl)
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._stats)
+            out["entries"] = len(self._entries)
+            out["inflight"] = len(self._inflight)
+        return out
+
+
+# --- Process-wide cache (HTTP goes through the shared resilient client, see utils/http_client.py) --------------------
+# Local misses consult the cross-process backend first, so replicas share one upstream fetch per TTL
+# (see utils/cache_backend.py).
+_cache = TTLCache()
+
+
+def _download_json(url: str, timeout: float) -> dict:
+    with trace("http_fetch", url):
+        resp = get_client().get(url, timeout=timeout)
+        resp.raise_for_status()
+    with trace("json_decode", url):
+        return resp.json()
+
+
+def get_json(url: str, ttl: Optional[float] = None, timeout: float = DEFAULT_TIMEOUT) -> dict:
+    # Raises on failure when nothing (not even a stale copy) is cached.
+    ttl = _cache.default_ttl if ttl is None else ttl
+    return _cache.get(url, lambda: load_shared(f"json:{url}", lambda: _download_json(url, timeout), ttl=ttl), ttl=ttl)
+
+
+def poll_json(url: str, ttl: float, timeout: float = DEFAULT_TIMEOUT) -> dict:
+    # For background pollers (see utils/live.py): never returns a stale copy, it blocks on the refresh instead. Other
+    # replicas' fetches younger than `ttl` are reused, and the result refreshes the process cache for get_json().
+    shared = load_shared(f"json:{url}", lambda: _download_json(url, timeout), ttl=ttl)
+    _cache.put(url, shared.value, shared.fetched_at, ttl)
+    return shared.value
+
+
+def fetched_at(url: str) -> Optional[float]:
+    entry = _cache.peek(url)
+    return entry.fetched_at if entry is not None else None
+
+
+def cache_stats() -> Dict[str, int]:
+    return _cache.stats()
+
+
+def clear_cache(url: Optional[str] = None) -> None:
+    _cache.invalidate(url)
@@ -0,0 +1,123 @@
+# utils/figures.py
+# Process-wide LRU cache of built Plotly figures keyed by (chart id, dataset version, theme).
+# Reruns that don't change the underlying data reuse the figure instead of rebuilding and re-validating
+# every trace. Each figure is also serialized to its plain dict once: st.plotly_chart deep-copies a figure through
+# to_dict() on every render, and a cached figure hands back the stored dict instead, leaving only the JSON encoding
+# (Streamlit has no public way to pass a pre-encoded spec). Memory is bounded by entry count and by an estimate of
+# each figure's data arrays.
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.tracing import trace
+
+DEFAULT_THEME = "plotly_white"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 256
+# trace attributes that hold per-point data (top level, and under marker/line)
+DATA_ATTRS = ("x", "y", "z", "text", "hovertext", "customdata", "ids", "values", "labels", "parents", "lat", "lon",
+              "r", "theta", "open", "high", "low", "close", "color", "size", "width")
+TRACE_OVERHEAD = 4096   # bytes per trace besides its arrays (properties, validators)
+
+FigureKey = Tuple[str, Hashable, str]
+Figure = Any   # plotly.graph_objects.Figure; not imported here so plotly stays lazily loaded
+
+
+class FigureCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[FigureKey, Tuple[Figure, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_or_build(self, key: FigureKey, build: Callable[[str], Figure]) -> Figure:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[0]
+            self._stats["misses"] += 1
+
+        with trace("figure_build", key[0]):
+            fig = freeze_figure(build(key[2]))
+        size = 2 * figure_size(fig)   # the figure and its serialized dict
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key][0]
+            self._entries[key] = (fig, size)
+            self._bytes += size
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+        return fig
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._stats)
+            out["entries"] = len(self._entries)
+            out["bytes"] = self._bytes
+        return out
+
+
+_cache = FigureCache()
+
+
+def cached_figure(chart_id: str, version: Hashable, build: Callable[[str], Figure], theme: str = DEFAULT_THEME) -> Figure:
+    # build(theme) is only called on a miss. The returned figure is shared between sessions: render it, don't mutate it.
+    return _cache.get_or_build((chart_id, version, theme), build)
+
+
+@lru_cache(maxsize=None)
+def _frozen_figure_class() -> type:
+    from plotly.graph_objects import Figure as PlotlyFigure
+
+    class FrozenFigure(PlotlyFigure):
+        def to_dict(self) -> dict:
+            frozen = getattr(self, "_frozen_dict", None)
+            return super().to_dict() if frozen is None else frozen
+
+    return FrozenFigure
+
+
+def freeze_figure(fig: Figure) -> Figure:
+    # A read-only copy of `fig` whose to_dict() returns the dict serialized here; mutating it afterwards would not show.
+    frozen = _frozen_figure_class()(fig)
+    frozen._frozen_dict = fig.to_dict()
+    return frozen
+
+
+def _array_size(value: Any) -> int:
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        return value.nbytes
+    if isinstance(value, (np.ndarray, list, tuple)):
+        # one reference per item, plus the text of string items
+        return 8 * len(value) + sum(len(v) for v in value if isinstance(v, str))
+    return 0
+
+
+def figure_size(fig: Figure) -> int:
+    # Rough in-memory size from the traces' data arrays, without serializing the figure.
+    size = 0
+    for data in fig.data:
+        size += TRACE_OVERHEAD
+        for parent in (data, getattr(data, "marker", None), getattr(data, "line", None)):
+            if parent is not None:
+                size += sum(_array_size(getattr(parent, attr, None)) for attr in DATA_ATTRS)
+    return size
+
+
+def frame_version(df: pd.DataFrame) -> int:
+    # Content hash usable as a dataset version for small frames that have no version of their own.
+    return int(pd.util.hash_pandas_object(df, index=False).sum())
+
+
+def figure_cache_stats() -> Dict[str, int]:
+    return _cache.stats()
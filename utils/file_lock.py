@@ -0,0 +1,31 @@
+# utils/file_lock.py
+# Cross-process exclusive lock on a sidecar file, for stores that the worker (ingest.py) and the app processes both
+# write. flock is per open file, so a process never shares a lock with itself: guard each store with its own file and
+# a threading.Lock for the threads of one process.
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:   # not on Windows; writers are then only serialized within the process
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    # Yields whether the lock is held (always True when blocking).
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        held = True
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                held = False
+        yield held
+    finally:
+        os.close(fd)   # also releases the flock
@@ -0,0 +1,232 @@
+# utils/http_client.py
+# Shared HTTP client for the upstream APIs (explorer stats-service, Dune). Every call gets connect/read timeouts
+# inside an overall time budget, bounded retries with exponential backoff and jitter (honouring Retry-After),
+# a per-host circuit breaker that fails fast while an upstream is down, and a per-host concurrency limit, so
+# worker threads never pile up behind a slow host.
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.tracing import record
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_BUDGET = 15              # seconds for a whole call, retries included
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5            # first retry delay (seconds), doubled per attempt
+DEFAULT_BACKOFF_CAP = 8.0
+DEFAULT_HOST_CONCURRENCY = 8
+DEFAULT_FAILURE_THRESHOLD = 5    # consecutive failures that open a host's circuit
+DEFAULT_RESET_TIMEOUT = 30.0     # seconds an open circuit waits before letting a probe through
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpen(requests.RequestException):
+    pass
+
+
+class HostBusy(requests.RequestException):
+    pass
+
+
+class CircuitBreaker:
+    # closed -> (threshold consecutive failures) -> open -> (reset_timeout) -> half-open -> success: closed
+    #                                                                                   -> failure: open
+    # Half-open admits a single probe request; everyone else is short-circuited until it records its outcome.
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe: Optional[int] = None   # thread running the half-open probe
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset_timeout else "open"
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probe == threading.get_ident():
+                # the probe's own retry (e.g. after a 429) is still the probe
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probe is not None:
+                return False
+            self._probe = threading.get_ident()
+            return True
+
+    def release(self) -> None:
+        # The calling thread's probe ended without an outcome (429, no slot, out of budget): the next caller probes.
+        with self._lock:
+            if self._probe == threading.get_ident():
+                self._probe = None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe = None
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                # (re)open; a failed half-open probe restarts the wait
+                self._opened_at = time.monotonic()
+
+
+@dataclass
+class _Host:
+    breaker: CircuitBreaker
+    slots: threading.BoundedSemaphore
+    metrics: Dict[str, int] = field(default_factory=lambda: {
+        "requests": 0, "retries": 0, "failures": 0, "short_circuited": 0, "busy": 0,
+    })
+
+
+class HttpClient:
+    def __init__(
+        self,
+        pool_connections: int = 16,     # hosts whose connection pools are kept (one per compared chain)
+        pool_maxsize: int = 16,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        backoff_cap: float = DEFAULT_BACKOFF_CAP,
+        host_concurrency: int = DEFAULT_HOST_CONCURRENCY,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_cap = backoff_cap
+        self.host_concurrency = host_concurrency
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: Dict[str, _Host] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> _Host:
+        netloc = urlsplit(url).netloc
+        with self._lock:
+            host = self._hosts.get(netloc)
+            if host is None:
+                host = _Host(CircuitBreaker(self.failure_threshold, self.reset_timeout),
+                             threading.BoundedSemaphore(self.host_concurrency))
+                self._hosts[netloc] = host
+            return host
+
+    def _count(self, host: _Host, metric: str) -> None:
+        with self._lock:
+            host.metrics[metric] += 1
+
+    def _delay(self, attempt: int, resp: Optional[requests.Response]) -> float:
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after is not None and retry_after.isdigit():
+            return float(retry_after)
+        # "full jitter" between half and all of the exponential step
+        return min(self.backoff_cap, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def request(self, method: str, url: str, timeout: Optional[float] = None, retries: Optional[int] = None,
+                **kwargs: Any) -> requests.Response:
+        # `timeout` is the budget for the whole call including retries and backoff. Returns the last response
+        # (callers still raise_for_status); raises CircuitOpen/HostBusy or the last connection error.
+        host = self._host(url)
+        retries = self.retries if retries is None else retries
+        budget = DEFAULT_BUDGET if timeout is None else timeout
+        deadline = time.monotonic() + budget
+        resp: Optional[requests.Response] = None
+        error: Optional[Exception] = None
+        try:
+            for attempt in range(retries + 1):
+                if not host.breaker.allow():
+                    self._count(host, "short_circuited")
+                    raise CircuitOpen(f"{urlsplit(url).netloc} is failing, circuit open for another "
+                                      f"{host.breaker.retry_in():.1f}s")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                waited = time.perf_counter()
+                if not host.slots.acquire(timeout=remaining):
+                    self._count(host, "busy")
+                    raise HostBusy(f"{self.host_concurrency} requests to {urlsplit(url).netloc} already in flight")
+                waited = time.perf_counter() - waited
+                if waited > 0.001:
+                    record("http_wait", waited, detail=urlsplit(url).netloc)
+                resp, error = None, None
+                try:
+                    self._count(host, "requests")
+                    remaining = max(0.001, deadline - time.monotonic())
+                    resp = self.session.request(method, url, timeout=(min(self.connect_timeout, remaining), remaining),
+                                                **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                finally:
+                    host.slots.release()
+
+                if resp is not None and resp.status_code not in RETRY_STATUSES:
+                    host.breaker.record_success()
+                    return resp
+                if resp is None or resp.status_code != 429:
+                    # rate limiting means the host is up; everything else counts against the circuit
+                    self._count(host, "failures")
+                    host.breaker.record_failure()
+                if attempt == retries:
+                    break
+                delay = self._delay(attempt, resp)
+                if time.monotonic() + delay >= deadline:
+                    break
+                self._count(host, "retries")
+                time.sleep(delay)
+        finally:
+            host.breaker.release()
+
+        if resp is not None:
+            return resp
+        raise error or requests.Timeout(f"{url}: no attempt fit in the {budget:g}s budget")
+
+    def get(self, url: str, timeout: Optional[float] = None, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, timeout=timeout, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            hosts = dict(self._hosts)
+            out = {netloc: dict(host.metrics) for netloc, host in hosts.items()}
+        for netloc, host in hosts.items():
+            out[netloc]["circuit"] = host.breaker.state
+        return out
+
+
+# --- Process-wide client ---------------------------------------------------------------------------------------------
+_client = HttpClient()
+
+
+def get_client() -> HttpClient:
+    return _client
+
+
+def http_stats() -> Dict[str, Dict[str, Any]]:
+    return _client.stats()
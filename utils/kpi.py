@@ -0,0 +1,237 @@
+# utils/kpi.py
+# Rolling-window KPI engine for daily series (max/min with dates, mean, total, percent change).
+# Points are pushed in date order and every window is maintained incrementally: monotonic deques for
+# max/min and a running sum for the mean, so a new day costs O(1) amortized per window, and a revised day adjusts
+# them in place instead of replaying history. Windows are bounded by date (the N days up to the last date), so a
+# gap in the series doesn't stretch them. Results are memoized per window until the next change.
+import operator
+import threading
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.tracing import traced
+
+# window name -> size in days (None = all-time)
+DEFAULT_WINDOWS: Dict[str, Optional[int]] = {"7d": 7, "30d": 30, "90d": 90, "365d": 365, "all": None}
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    window: str
+    days: int
+    max_value: Optional[float]
+    max_date: Optional[pd.Timestamp]
+    min_value: Optional[float]
+    min_date: Optional[pd.Timestamp]
+    mean: Optional[float]
+    total: float
+
+
+class _Window:
+    # Covers the settled points only; the last point (the day still in progress) is kept out of the deques and
+    # folded in by stats(), so revising it is O(1).
+    def __init__(self, name: str, size: Optional[int]):
+        self.name = name
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self.first_idx = 0
+        # (idx, date, value); values decreasing in _max, increasing in _min
+        self._max: Deque[Tuple[int, pd.Timestamp, float]] = deque()
+        self._min: Deque[Tuple[int, pd.Timestamp, float]] = deque()
+
+    def settle(self, idx: int, date: pd.Timestamp, value: float) -> None:
+        self.total += value
+        self.count += 1
+        # ties keep the earliest date, matching idxmax/idxmin
+        while self._max and self._max[-1][2] < value:
+            self._max.pop()
+        self._max.append((idx, date, value))
+        while self._min and self._min[-1][2] > value:
+            self._min.pop()
+        self._min.append((idx, date, value))
+
+    def evict(self, last_date: pd.Timestamp, points: List[Tuple[pd.Timestamp, float]]) -> None:
+        # drop settled points more than `size` days before the last date; `points[-1]` is the open point
+        if self.size is None:
+            return
+        cutoff = last_date - pd.Timedelta(days=self.size)
+        while self.first_idx < len(points) - 1 and points[self.first_idx][0] <= cutoff:
+            self.total -= points[self.first_idx][1]
+            self.count -= 1
+            self.first_idx += 1
+        while self._max and self._max[0][0] < self.first_idx:
+            self._max.popleft()
+        while self._min and self._min[0][0] < self.first_idx:
+            self._min.popleft()
+
+    def revise(self, idx: int, old: float, points: List[Tuple[pd.Timestamp, float]]) -> None:
+        # a settled point changed value; `points[idx]` already holds the new one
+        if idx < self.first_idx:
+            return
+        self.total += points[idx][1] - old
+        _revise_extremes(self._max, idx, old, points, self.first_idx, operator.ge)
+        _revise_extremes(self._min, idx, old, points, self.first_idx, operator.le)
+
+    def stats(self, points: List[Tuple[pd.Timestamp, float]]) -> WindowStats:
+        if not points:
+            return WindowStats(self.name, 0, None, None, None, None, None, 0.0)
+        date, value = points[-1]
+        max_date, max_value = date, value
+        if self._max and self._max[0][2] >= value:
+            _, max_date, max_value = self._max[0]
+        min_date, min_value = date, value
+        if self._min and self._min[0][2] <= value:
+            _, min_date, min_value = self._min[0]
+        count = self.count + 1
+        total = self.total + value
+        return WindowStats(self.name, count, max_value, max_date, min_value, min_date, total / count, total)
+
+
+def _revise_extremes(entries: Deque[Tuple[int, pd.Timestamp, float]], idx: int, old: float,
+                     points: List[Tuple[pd.Timestamp, float]], first_idx: int, keeps) -> None:
+    # Re-derive a monotonic deque after points[idx] changed from `old`. `keeps(a, b)` says whether an earlier value
+    # a stays in the deque ahead of a later value b (>= for max, <= for min). Entries after idx don't depend on it;
+    # earlier entries the new value now beats are popped; and only when the value moved the other way are the
+    # points it used to hide (back to the previous entry) scanned again.
+    later = []
+    while entries and entries[-1][0] > idx:
+        later.append(entries.pop())
+    if entries and entries[-1][0] == idx:
+        entries.pop()
+    best = later[-1][2] if later else None
+    stop = idx - 1
+    if not keeps(points[idx][1], old):
+        stop = entries[-1][0] if entries else first_idx - 1
+    rescanned = []
+    for i in range(idx, stop, -1):
+        date, value = points[i]
+        if best is None or keeps(value, best):
+            rescanned.append((i, date, value))
+            best = value
+    while entries and not keeps(entries[-1][2], best):
+        entries.pop()
+    entries.extend(reversed(rescanned))
+    entries.extend(reversed(later))
+
+
+class RollingKPIEngine:
+    def __init__(self, windows: Optional[Dict[str, Optional[int]]] = None):
+        self.windows = dict(DEFAULT_WINDOWS if windows is None else windows)
+        self._lock = threading.Lock()
+        # the source series version the engine was last synced to (see utils.kpi_snapshot.sync_engine)
+        self.source_version: Optional[int] = None
+        self.sync_lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._windows = {name: _Window(name, size) for name, size in self.windows.items()}
+        self._all: List[Tuple[pd.Timestamp, float]] = []
+        self._dates: List[pd.Timestamp] = []   # same order as _all, for binary search
+        self._memo: Dict[str, WindowStats] = {}
+
+    def _push(self, date: pd.Timestamp, value: float) -> None:
+        idx = len(self._all)
+        if idx:
+            prev_date, prev_value = self._all[-1]
+            for window in self._windows.values():
+                window.settle(idx - 1, prev_date, prev_value)
+        self._all.append((date, value))
+        self._dates.append(date)
+        for window in self._windows.values():
+            window.evict(date, self._all)
+
+    def _revise(self, idx: int, value: float) -> None:
+        date, old = self._all[idx]
+        self._all[idx] = (date, value)
+        if idx == len(self._all) - 1:
+            return
+        for window in self._windows.values():
+            window.revise(idx, old, self._all)
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        return self._all[-1][0] if self._all else None
+
+    @traced("kpi_compute")
+    def extend(self, dates: Iterable, values: Iterable[float]) -> int:
+        # Apply points in date order. New days are pushed and revised days adjust the windows in place (the sum
+        # moves by the difference, the max/min deques are patched around the point). A day inserted between
+        # existing ones - a backfilled gap - shifts every later index and is the one case that rebuilds.
+        # Returns the number of points added or changed.
+        changed = 0
+        inserted: List[Tuple[pd.Timestamp, float]] = []
+        with self._lock:
+            for date, value in zip(dates, values):
+                date = pd.Timestamp(date)
+                value = float(value)
+                last = self.last_date
+                if last is None or date > last:
+                    self._push(date, value)
+                    changed += 1
+                    continue
+                i = bisect_left(self._dates, date)
+                if self._dates[i] != date:
+                    inserted.append((date, value))
+                elif self._all[i][1] != value:
+                    self._revise(i, value)
+                    changed += 1
+            if inserted:
+                self._rebuild(sorted(self._all + inserted))
+                changed += len(inserted)
+            if changed:
+                self._memo.clear()
+        return changed
+
+    def reset(self, dates: Iterable, values: Iterable[float]) -> None:
+        with self._lock:
+            self._rebuild([(pd.Timestamp(d), float(v)) for d, v in zip(dates, values)])
+
+    def _rebuild(self, points: List[Tuple[pd.Timestamp, float]]) -> None:
+        self._reset()
+        for date, value in points:
+            self._push(date, value)
+
+    def stats(self, window: str) -> WindowStats:
+        with self._lock:
+            result = self._memo.get(window)
+            if result is None:
+                result = self._windows[window].stats(self._all)
+                self._memo[window] = result
+            return result
+
+    def pct_change(self, lag: int) -> Optional[float]:
+        # last value vs the value `lag` days before the last date, in percent; None when the series has no point
+        # on that day
+        if lag < 1:
+            raise ValueError(f"lag must be at least one day, got {lag}")
+        with self._lock:
+            if not self._all:
+                return None
+            target = self._all[-1][0] - pd.Timedelta(days=lag)
+            i = bisect_left(self._dates, target)
+            if i == len(self._dates) or self._dates[i] != target:
+                return None
+            new = self._all[-1][1]
+            old = self._all[i][1]
+        if old == 0:
+            return None
+        return (new - old) / old * 100.0
+
+
+# --- Process-wide engines --------------------------------------------------------------------------------------------
+_engines: Dict[str, RollingKPIEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(name: str, **kwargs) -> RollingKPIEngine:
+    with _engines_lock:
+        engine = _engines.get(name)
+        if engine is None:
+            engine = RollingKPIEngine(**kwargs)
+            _engines[name] = engine
+    return engine
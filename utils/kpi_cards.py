@@ -0,0 +1,139 @@
+# utils/kpi_cards.py
+# KPI card grid component. The CSS is built once per process and injected once per page run (not per fragment
+# refresh), and a whole grid is one element instead of one markdown block per card inside st.columns. Each session
+# keeps the HTML of every card it rendered, so a repaint only rebuilds the cards whose value changed, and the last
+# grid is painted immediately on the next run before any data is loaded. Streamlit drops elements a run doesn't
+# re-emit, so every run sends the grid once (that first paint); when the live values match it, it isn't painted a
+# second time. Put the grid inside st.fragment(run_every=...) to refresh it without rerunning
+# the page (see pages/2_⛓Transaction_Analysis.py). Cards can carry an inline SVG sparkline (a few hundred bytes,
+# instead of a Plotly figure per refresh).
+import html
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import streamlit as st
+
+from utils.decimate import lttb_indices
+from utils.tracing import trace
+
+SPARK_POINTS = 120   # sparklines are decimated to this many points (LTTB)
+
+# values colour #7132f5 unless the grid sets an accent; "lg" is the larger card used by the Contracts page
+_SIZES = {
+    "md": {"padding": "18px 16px", "min_height": "94px", "title": "14px", "value": "26px", "gap": "8px"},
+    "lg": {"padding": "20px", "min_height": "0", "title": "16px", "value": "28px", "gap": "10px"},
+}
+
+
+def _build_css() -> str:
+    rules = [
+        ".ink-kpi-grid{display:grid;gap:16px;margin-bottom:8px}",
+        ".ink-kpi-card{background-color:#fff;border-radius:15px;box-shadow:0 4px 10px rgba(0,0,0,.05);"
+        "text-align:center;transition:all .22s ease}",
+        ".ink-kpi-card:hover{box-shadow:0 6px 16px rgba(0,0,0,.12);transform:translateY(-3px)}",
+        ".ink-kpi-title{font-weight:600;color:#444}",
+        ".ink-kpi-value{font-weight:800;color:var(--ink-kpi-accent,#7132f5)}",
+        ".ink-kpi-desc{font-size:12px;color:#777;margin-top:6px}",
+        ".ink-kpi-spark svg{display:block;width:100%;height:36px;margin-top:8px}",
+        ".ink-kpi-note{font-size:14px;color:rgba(49,51,63,.6);margin-top:4px}",
+        "@media (max-width:640px){.ink-kpi-grid{grid-template-columns:1fr!important}}",
+    ]
+    for size, s in _SIZES.items():
+        rules.append(f".ink-kpi-{size} .ink-kpi-card{{padding:{s['padding']};min-height:{s['min_height']}}}"
+                     f".ink-kpi-{size} .ink-kpi-title{{font-size:{s['title']}}}"
+                     f".ink-kpi-{size} .ink-kpi-value{{font-size:{s['value']};margin-top:{s['gap']}}}")
+    return "<style>" + "".join(rules) + "</style>"
+
+
+KPI_CSS = _build_css()
+
+
+@dataclass(frozen=True)
+class KpiCard:
+    title: str
+    value: str
+    desc: str = ""
+    chart: str = ""    # trusted inline markup, e.g. sparkline_svg(); not escaped
+
+
+def inject_kpi_style() -> None:
+    # Once per page run, outside any fragment, so fragment refreshes don't re-send it.
+    st.markdown(KPI_CSS, unsafe_allow_html=True)
+
+
+def sparkline_svg(values: Sequence[float], color: str = "#7132f5", width: int = 200, height: int = 36) -> str:
+    # Polyline scaled to the box (stretched by CSS); NaNs are skipped, fewer than two points draw nothing.
+    y = np.asarray(values, dtype="float64")
+    y = y[~np.isnan(y)]
+    if len(y) < 2:
+        return ""
+    x = np.arange(len(y), dtype="float64")
+    keep = lttb_indices(x, y, SPARK_POINTS)
+    x, y = x[keep] / x[-1] * width, y[keep]
+    span = y.max() - y.min()
+    # flat series sit in the middle; 2px of headroom so the stroke isn't clipped
+    y = np.full_like(y, height / 2) if span == 0 else height - 2 - (y - y.min()) / span * (height - 4)
+    points = " ".join(f"{a:.1f},{b:.1f}" for a, b in zip(x, y))
+    return (f'<svg viewBox="0 0 {width} {height}" preserveAspectRatio="none">'
+            f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="2" '
+            f'vector-effect="non-scaling-stroke"/></svg>')
+
+
+def _card_html(card: KpiCard) -> str:
+    chart = f'<div class="ink-kpi-spark">{card.chart}</div>' if card.chart else ""
+    return (f'<div class="ink-kpi-card"><div class="ink-kpi-title">{html.escape(card.title)}</div>'
+            f'<div class="ink-kpi-value">{html.escape(str(card.value))}</div>'
+            f'<div class="ink-kpi-desc">{html.escape(card.desc)}</div>{chart}</div>')
+
+
+class KpiGrid:
+    # One placeholder per grid; create it where the grid should appear (inside the fragment, if any).
+    # `accent` is a CSS colour for the values (e.g. a chain's colour on the Superchain Comparison page).
+    def __init__(self, key: str, columns: int = 3, size: str = "md", accent: Optional[str] = None):
+        self.key = key
+        self.columns = columns
+        self.size = size
+        self.accent = accent
+        self.slot = st.empty()
+        self._state: Dict = st.session_state.setdefault(f"_kpi_grid_{key}", {"cards": {}, "html": None})
+        self._painted: Optional[str] = None
+        # repaint what this session saw last, before anything is loaded
+        if self._state["html"] is not None:
+            self._paint(self._state["html"])
+
+    @property
+    def painted(self) -> bool:
+        return self._painted is not None
+
+    def _paint(self, markup: str) -> None:
+        self.slot.markdown(markup, unsafe_allow_html=True)
+        self._painted = markup
+
+    def render(self, cards: Sequence[KpiCard], note: Optional[str] = None) -> bool:
+        # Returns False when this run already painted exactly this grid (it isn't sent again).
+        with trace("kpi_render", self.key):
+            memo: Dict[KpiCard, str] = self._state["cards"]
+            parts = []
+            for card in cards:
+                part = memo.get(card)
+                if part is None:
+                    part = memo[card] = _card_html(card)
+                parts.append(part)
+            # drop cards no longer shown, so the memo stays the size of one grid (plus the snapshot's variant)
+            if len(memo) > 2 * len(cards):
+                keep = set(cards)
+                for card in [c for c in memo if c not in keep]:
+                    del memo[card]
+            note_html = f'<div class="ink-kpi-note">{html.escape(note)}</div>' if note else ""
+            accent = f";--ink-kpi-accent:{html.escape(self.accent)}" if self.accent else ""
+            markup = (f'<div class="ink-kpi-grid ink-kpi-{self.size}" '
+                      f'style="grid-template-columns:repeat({self.columns},minmax(0,1fr)){accent}">'
+                      f'{"".join(parts)}</div>{note_html}')
+            if markup == self._painted:
+                return False
+            self._paint(markup)
+            if note is None:
+                # only live grids are remembered for the next run's instant paint
+                self._state["html"] = markup
+            return True
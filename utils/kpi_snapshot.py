@@ -0,0 +1,183 @@
+# utils/kpi_snapshot.py
+# Materialized KPI snapshots: one small versioned JSON file per page holding every KPI value (raw, unformatted),
+# the fetch time of each upstream it came from, and the derived rolling stats. Pages paint their KPI grid from the
+# last good snapshot before touching any upstream, then repaint in place once live data is in.
+# The worker (ingest.py) regenerates a page's snapshot whenever one of its source datasets is refreshed.
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from utils.kpi import RollingKPIEngine, get_engine
+from utils.paths import DATA_DIR
+from utils.shared_cache import read_dataset
+from utils.timeseries import DailySeries, get_series
+
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+SNAPSHOT_VERSION = 1
+
+# page -> {source name: worker dataset}
+PAGE_SOURCES = {
+    "transactions": {"main": "stats_main", "transactions": "stats_transactions"},
+    "contracts": {"contracts": "stats_contracts"},
+}
+
+
+@dataclass(frozen=True)
+class KpiSnapshot:
+    page: str
+    values: Dict[str, Any]
+    sources: Dict[str, float]     # source name -> upstream fetch time (epoch seconds)
+    generated_at: float
+
+    @property
+    def as_of(self) -> float:
+        # the oldest input bounds how current the snapshot is
+        return min(self.sources.values()) if self.sources else self.generated_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.as_of
+
+
+# --- Storage ---------------------------------------------------------------------------------------------------------
+_memo: Dict[str, Tuple[float, KpiSnapshot]] = {}
+_lock = threading.Lock()
+
+
+def _path(page: str) -> Path:
+    return SNAPSHOT_DIR / f"{page}.json"
+
+
+def read_snapshot(page: str) -> Optional[KpiSnapshot]:
+    # Decoded once per file change; None when missing, unreadable or written by another format version.
+    path = _path(page)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    with _lock:
+        memo = _memo.get(page)
+        if memo is not None and memo[0] == mtime:
+            return memo[1]
+    try:
+        raw = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+    if raw.get("version") != SNAPSHOT_VERSION:
+        return None
+    snapshot = KpiSnapshot(page=page, values=raw["values"], sources=raw["sources"], generated_at=raw["generated_at"])
+    with _lock:
+        _memo[page] = (mtime, snapshot)
+    return snapshot
+
+
+def write_snapshot(page: str, values: Dict[str, Any], sources: Dict[str, float], force: bool = False) -> bool:
+    # Skips the write when the stored snapshot was built from the same or newer upstream data (unless force).
+    current = read_snapshot(page)
+    if not force and current is not None and all(
+        sources.get(name, 0) <= current.sources.get(name, 0) for name in set(sources) | set(current.sources)
+    ):
+        return False
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    payload = {"version": SNAPSHOT_VERSION, "generated_at": time.time(), "sources": sources, "values": values}
+    path = _path(page)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(payload, separators=(",", ":")))
+    os.replace(tmp, path)
+    return True
+
+
+# --- KPI extraction (shared by the pages and the worker) -------------------------------------------------------------
+def stat_value(payload: Optional[dict], key: str) -> Any:
+    return ((payload or {}).get(key) or {}).get("value")
+
+
+def daily_chart(data_main: Optional[dict]) -> list:
+    return ((data_main or {}).get("daily_new_transactions") or {}).get("chart") or []
+
+
+def daily_transactions_series(data_main: dict, source_token: Optional[Any] = None,
+                              name: str = "daily_transactions") -> DailySeries:
+    # Merges the payload's 30-day chart into the persisted full-history series (no-op for a token already merged).
+    series = get_series(name, dtype="int64")
+    series.merge_chart(daily_chart(data_main), source_token=source_token)
+    return series
+
+
+def sync_engine(engine: RollingKPIEngine, series: DailySeries) -> None:
+    # Feeds the engine only the days the series changed since the version the engine last saw (new days and
+    # revised ones alike); a full resync only when that version is unknown or has left the series' change log.
+    with engine.sync_lock:
+        version = series.version
+        if engine.source_version == version:
+            return
+        first = None if engine.source_version is None else series.changed_since(engine.source_version)
+        if first is None:
+            full = series.between()
+            engine.reset(full["date"], full["value"])
+        elif not pd.isna(first):
+            tail = series.since(first)
+            engine.extend(tail["date"], tail["value"])
+        engine.source_version = version
+
+
+def transactions_values(data_main: dict, data_tx: Optional[dict], engine: RollingKPIEngine) -> Dict[str, Any]:
+    # `engine` must already hold the daily series (see sync_engine).
+    stats_30d = engine.stats("30d")
+    return {
+        "average_block_time": stat_value(data_main, "average_block_time"),
+        "total_addresses": stat_value(data_main, "total_addresses"),
+        "total_blocks": stat_value(data_main, "total_blocks"),
+        "total_transactions": stat_value(data_main, "total_transactions"),
+        "yesterday_transactions": stat_value(data_main, "yesterday_transactions"),
+        "transactions_fee_24h": stat_value(data_tx, "transactions_fee_24h"),
+        "average_transactions_fee_24h": stat_value(data_tx, "average_transactions_fee_24h"),
+        "transactions_24h": stat_value(data_tx, "transactions_24h"),
+        "pending_transactions_30m": stat_value(data_tx, "pending_transactions_30m"),
+        "max_tx_value": stats_30d.max_value,
+        "max_tx_date": stats_30d.max_date.date().isoformat() if stats_30d.max_date is not None else None,
+        "min_tx_value": stats_30d.min_value,
+        "min_tx_date": stats_30d.min_date.date().isoformat() if stats_30d.min_date is not None else None,
+        "mean_tx_30": stats_30d.mean,
+        "mean_days": stats_30d.days,
+        "pct_1d": engine.pct_change(1),
+        "pct_7d": engine.pct_change(7),
+    }
+
+
+def contracts_values(data_contracts: Optional[dict]) -> Dict[str, Any]:
+    return {
+        "total_contracts": stat_value(data_contracts, "total_contracts"),
+        "new_contracts_24h": stat_value(data_contracts, "new_contracts_24h"),
+        "total_verified_contracts": stat_value(data_contracts, "total_verified_contracts"),
+        "new_verified_contracts_24h": stat_value(data_contracts, "new_verified_contracts_24h"),
+    }
+
+
+# --- Regeneration from the worker datasets ---------------------------------------------------------------------------
+_refresh_lock = threading.Lock()
+
+
+def refresh_snapshot(page: str) -> bool:
+    # Rebuilds `page`'s snapshot from the datasets on disk; returns False if a required dataset is missing.
+    with _refresh_lock:
+        datasets = {name: read_dataset(dataset) for name, dataset in PAGE_SOURCES[page].items()}
+        if page == "transactions":
+            if datasets["main"] is None:
+                return False
+            engine = get_engine("daily_transactions")
+            sync_engine(engine, daily_transactions_series(datasets["main"].data, datasets["main"].fetched_at))
+            tx = datasets["transactions"]
+            values = transactions_values(datasets["main"].data, tx.data if tx else None, engine)
+        else:
+            if datasets["contracts"] is None:
+                return False
+            values = contracts_values(datasets["contracts"].data)
+        sources = {name: ds.fetched_at for name, ds in datasets.items() if ds is not None}
+        return write_snapshot(page, values, sources, force=True)
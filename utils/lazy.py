@@ -0,0 +1,56 @@
+# utils/lazy.py
+# Deferred imports for heavy dependencies (plotly, snowflake-connector, cryptography, ...).
+# lazy_import() returns a stand-in that imports the real module on first attribute access, so a page only pays
+# for the modules its rendered sections actually use. The cost of each first import is recorded.
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Dict
+
+from utils.tracing import record
+
+_costs: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+class LazyModule(ModuleType):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            name = self.__name__
+            already_loaded = name in sys.modules
+            started = time.perf_counter()
+            module = importlib.import_module(name)
+            elapsed = time.perf_counter() - started
+            if not already_loaded:
+                with _lock:
+                    _costs.setdefault(name, elapsed)
+                record("import", elapsed, detail=name)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__["_lazy_module"] is not None
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def import_costs() -> Dict[str, float]:
+    # module name -> seconds spent on its first (cold) import in this process
+    with _lock:
+        return dict(_costs)
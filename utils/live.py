@@ -0,0 +1,198 @@
+# utils/live.py
+# Shared pollers for the fast-moving network stats (pending transactions, block time) behind the pages' live mode.
+# A poller runs one background thread per process that reads the upstream every `interval` seconds while anyone is
+# watching and appends a sample to a fixed-size ring buffer. Viewers (st.fragment(run_every=...) reruns) only read
+# the buffer, so 50 sessions cost one upstream poll per interval, and replicas share it through the cache backend
+# (see utils/cache_backend.py). The thread exits after `idle` seconds without a viewer; the next viewer restarts it.
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.fetch import API_MAIN, API_TRANSACTIONS, fetched_at, poll_json
+from utils.kpi_snapshot import stat_value
+from utils.tracing import trace
+
+DEFAULT_INTERVAL = 10   # seconds between upstream polls
+DEFAULT_CAPACITY = 360  # samples kept (an hour at the default interval)
+DEFAULT_IDLE = 120      # seconds without a viewer before the poll thread stops
+
+
+@dataclass(frozen=True)
+class LiveMetric:
+    name: str
+    url: str
+    key: str    # stat key in the stats-service payload
+
+
+NETWORK_METRICS = (
+    LiveMetric("pending_transactions_30m", API_TRANSACTIONS, "pending_transactions_30m"),
+    LiveMetric("average_block_time", API_MAIN, "average_block_time"),
+)
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+# --- Ring buffer -----------------------------------------------------------------------------------------------------
+class RingBuffer:
+    # Last `capacity` samples in preallocated arrays (timestamps + one float64 column per metric); appends are O(1)
+    # and overwrite the oldest slot once full. Not thread-safe on its own (LivePoller holds its lock around it).
+    def __init__(self, columns: Sequence[str], capacity: int = DEFAULT_CAPACITY):
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self._ts = np.zeros(capacity, "float64")
+        self._values = np.full((capacity, len(self.columns)), np.nan)
+        self._head = 0   # next slot to write
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, ts: float, values: Sequence[float]) -> None:
+        self._ts[self._head] = ts
+        self._values[self._head] = values
+        self._head = (self._head + 1) % self.capacity
+        self._n = min(self._n + 1, self.capacity)
+
+    def last(self) -> Optional[Tuple[float, np.ndarray]]:
+        if not self._n:
+            return None
+        i = (self._head - 1) % self.capacity
+        return self._ts[i], self._values[i].copy()
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        # (timestamps, values) oldest first, as copies
+        if self._n < self.capacity:
+            return self._ts[:self._n].copy(), self._values[:self._n].copy()
+        order = np.r_[self._head:self.capacity, 0:self._head]
+        return self._ts[order], self._values[order]
+
+
+# --- Poller ----------------------------------------------------------------------------------------------------------
+class LivePoller:
+    def __init__(self, name: str, metrics: Sequence[LiveMetric] = NETWORK_METRICS,
+                 interval: float = DEFAULT_INTERVAL, capacity: int = DEFAULT_CAPACITY, idle: float = DEFAULT_IDLE):
+        self.name = name
+        self.metrics = tuple(metrics)
+        self.interval = interval
+        self.idle = idle
+        self._buffer = RingBuffer([m.name for m in self.metrics], capacity)
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_seen = 0.0
+        self._token: Optional[Tuple] = None
+        self._version = 0
+        self._frame: Tuple[int, Optional[pd.DataFrame]] = (-1, None)
+        self._stats = {"polls": 0, "samples": 0, "errors": 0}
+        self.error: Optional[str] = None
+
+    def poll(self) -> bool:
+        # One fresh read per upstream URL (poll_json never serves a stale copy, see utils/fetch.py). Appends a sample
+        # only when the payloads were fetched after the previous sample's, so another replica's reused fetch (shared
+        # backend) doesn't duplicate it.
+        with self._poll_lock, trace("live_poll", self.name):
+            urls = list(dict.fromkeys(m.url for m in self.metrics))
+            payloads = {url: poll_json(url, ttl=self.interval) for url in urls}
+            stamps = tuple(fetched_at(url) or time.time() for url in urls)
+            with self._lock:
+                self._stats["polls"] += 1
+                if stamps == self._token:
+                    return False
+                self._buffer.append(max(stamps), [_number(stat_value(payloads[m.url], m.key)) for m in self.metrics])
+                self._token = stamps
+                self._version += 1
+                self._stats["samples"] += 1
+            return True
+
+    def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            with self._lock:
+                if started - self._last_seen > self.idle:
+                    self._thread = None
+                    return
+            try:
+                self.poll()
+                self.error = None
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                self.error = str(e)
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def watch(self) -> None:
+        # Called by every viewer refresh: keeps the poll thread alive (starting it if needed, it polls right away).
+        # Never polls on the caller's thread; until the first sample lands latest() returns (None, {}).
+        with self._lock:
+            self._last_seen = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"live-{self.name}", daemon=True)
+                self._thread.start()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def latest(self) -> Tuple[Optional[float], Dict[str, Optional[float]]]:
+        # (sample time, {metric: value}) of the newest sample, or (None, {}) before the first one; a metric missing
+        # from that sample is None
+        with self._lock:
+            last = self._buffer.last()
+        if last is None:
+            return None, {}
+        ts, values = last
+        return float(ts), {name: None if np.isnan(value) else value
+                           for name, value in zip(self._buffer.columns, values.tolist())}
+
+    def frame(self) -> pd.DataFrame:
+        # All buffered samples as a ["time", <metric>...] frame, memoized until the next sample.
+        with self._lock:
+            version, df = self._frame
+            if version == self._version and df is not None:
+                return df
+            ts, values = self._buffer.arrays()
+            version = self._version
+        df = pd.DataFrame(values, columns=list(self._buffer.columns))
+        df.insert(0, "time", pd.to_datetime(ts, unit="s", utc=True))
+        with self._lock:
+            self._frame = (version, df)
+        return df
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["buffered"] = len(self._buffer)
+        out["running"] = self.running
+        return out
+
+
+_pollers: Dict[str, LivePoller] = {}
+_pollers_lock = threading.Lock()
+
+
+def get_poller(name: str, **kwargs) -> LivePoller:
+    with _pollers_lock:
+        poller = _pollers.get(name)
+        if poller is None:
+            poller = LivePoller(name, **kwargs)
+            _pollers[name] = poller
+    return poller
+
+
+def poller_stats() -> Dict[str, Dict[str, Any]]:
+    with _pollers_lock:
+        pollers = list(_pollers.values())
+    return {poller.name: poller.stats() for poller in pollers}
@@ -0,0 +1,86 @@
+# utils/loader.py
+# Page-level data loader: each page declares its upstream sources and they are fetched concurrently
+# (through the shared TTL cache) with a per-source deadline. Whatever arrives in time is returned,
+# failures are reported per source so the page can render partially.
+# Sources backed by a worker dataset (see ingest.py) are read from the shared local cache and only
+# fetched live when that dataset is missing or older than max_age.
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+from utils.fetch import DEFAULT_TIMEOUT, fetched_at, get_json
+from utils.shared_cache import read_dataset
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="page-loader")
+
+
+@dataclass(frozen=True)
+class Source:
+    name: str
+    url: str
+    timeout: float = DEFAULT_TIMEOUT   # deadline for this source, measured from the start of the load
+    ttl: Optional[float] = None        # cache TTL override (seconds)
+    dataset: Optional[str] = None      # name of the worker-maintained dataset holding this source
+    max_age: float = 15 * 60           # oldest worker dataset (seconds) served before falling back to a live fetch
+
+
+@dataclass
+class PageData:
+    data: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    fetched_at: Dict[str, float] = field(default_factory=dict)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.data.get(name, default)
+
+    def ok(self, name: str) -> bool:
+        return name in self.data
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors
+
+
+def _timed_fetch(source: Source):
+    started = time.perf_counter()
+    value = get_json(source.url, ttl=source.ttl, timeout=source.timeout)
+    return value, time.perf_counter() - started
+
+
+def load_page(sources: Iterable[Source]) -> PageData:
+    result = PageData()
+    started = time.perf_counter()
+    live = []
+    for source in sources:
+        dataset = read_dataset(source.dataset) if source.dataset else None
+        if dataset is not None and dataset.age <= source.max_age:
+            result.data[source.name] = dataset.data
+            result.fetched_at[source.name] = dataset.fetched_at
+            result.timings[source.name] = time.perf_counter() - started
+        else:
+            live.append(source)
+
+    # each fetch runs in a copy of the caller's context so its trace spans attach to the current page rerun
+    futures = {
+        source.name: (source, _executor.submit(contextvars.copy_context().run, _timed_fetch, source))
+        for source in live
+    }
+    for name, (source, future) in futures.items():
+        remaining = max(0.0, started + source.timeout - time.perf_counter())
+        try:
+            value, elapsed = future.result(timeout=remaining)
+        except FutureTimeout:
+            # the fetch keeps running in the background and will still warm the cache
+            result.errors[name] = f"timed out after {source.timeout:g}s"
+            result.timings[name] = time.perf_counter() - started
+        except Exception as e:
+            result.errors[name] = str(e)
+            result.timings[name] = time.perf_counter() - started
+        else:
+            result.data[name] = value
+            result.timings[name] = elapsed
+            result.fetched_at[name] = fetched_at(source.url) or time.time()
+    return result
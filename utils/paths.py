@@ -0,0 +1,6 @@
+# utils/paths.py
+# Local data directory shared by the stores, caches and the ingestion worker (override with INK_DATA_DIR).
+import os
+from pathlib import Path
+
+DATA_DIR = Path(os.environ.get("INK_DATA_DIR", Path(__file__).resolve().parent.parent / "data"))
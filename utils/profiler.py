@@ -0,0 +1,44 @@
+# utils/profiler.py
+# Hidden in-app profiler: append ?profile=1 to a page URL to see the slowest phases of the current rerun
+# in the sidebar (timings come from utils/tracing.py).
+import pandas as pd
+import streamlit as st
+
+from utils.cache_backend import backend_stats
+from utils.fetch import cache_stats
+from utils.figures import figure_cache_stats
+from utils.http_client import http_stats
+from utils.lazy import import_costs
+from utils.live import poller_stats
+from utils.tracing import RunTrace, finish_run
+
+
+def render_profiler_panel(run: RunTrace, top: int = 10) -> None:
+    # Call at the very end of a page script.
+    finish_run(run)
+    if st.query_params.get("profile") != "1":
+        return
+
+    with st.sidebar.expander("⏱ Profiler", expanded=True):
+        totals = run.totals()
+        st.caption(f"Page `{run.page}` · {sum(totals.values()) * 1000:.1f} ms traced this rerun")
+        slowest = run.slowest(top)
+        if slowest:
+            st.dataframe(
+                pd.DataFrame(
+                    [{"phase": s.phase, "detail": s.detail, "ms": round(s.seconds * 1000, 2)} for s in slowest]
+                ),
+                hide_index=True,
+                width="stretch"
+            )
+        st.markdown("**Per phase (ms)**")
+        st.json({phase: round(seconds * 1000, 2) for phase, seconds in sorted(totals.items(), key=lambda kv: -kv[1])})
+        st.markdown("**Caches**")
+        st.json({"fetch": cache_stats(), "shared": backend_stats(), "figures": figure_cache_stats(),
+                 "live": poller_stats()})
+        st.markdown("**Upstream hosts**")
+        st.json(http_stats())
+        costs = import_costs()
+        if costs:
+            st.markdown("**Deferred imports (ms)**")
+            st.json({name: round(seconds * 1000, 1) for name, seconds in sorted(costs.items(), key=lambda kv: -kv[1])})
@@ -0,0 +1,76 @@
+# utils/shared_cache.py
+# Local dataset cache written by the ingestion worker (ingest.py) and read by the pages.
+# Each dataset is one JSON file holding the normalized payload and the time it was fetched.
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from utils.paths import DATA_DIR
+
+CACHE_DIR = DATA_DIR / "cache"
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    data: Any
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+# decoded datasets, reused until the file on disk changes
+_memo: Dict[str, Tuple[float, Dataset]] = {}
+_memo_lock = threading.Lock()
+
+
+def _path(name: str) -> Path:
+    return CACHE_DIR / f"{name}.json"
+
+
+def write_dataset(name: str, data: Any, fetched_at: Optional[float] = None) -> Dataset:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    dataset = Dataset(name=name, data=data, fetched_at=fetched_at or time.time())
+    path = _path(name)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"fetched_at": dataset.fetched_at, "data": data}))
+    os.replace(tmp, path)
+    return dataset
+
+
+def read_dataset(name: str) -> Optional[Dataset]:
+    path = _path(name)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    with _memo_lock:
+        memo = _memo.get(name)
+        if memo is not None and memo[0] == mtime:
+            return memo[1]
+    try:
+        raw = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+    dataset = Dataset(name=name, data=raw["data"], fetched_at=raw["fetched_at"])
+    with _memo_lock:
+        _memo[name] = (mtime, dataset)
+    return dataset
+
+
+def freshness() -> Dict[str, float]:
+    # dataset name -> age in seconds, for every dataset currently on disk
+    if not CACHE_DIR.exists():
+        return {}
+    out = {}
+    for path in CACHE_DIR.glob("*.json"):
+        dataset = read_dataset(path.stem)
+        if dataset is not None:
+            out[dataset.name] = dataset.age
+    return out
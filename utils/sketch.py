@@ -0,0 +1,152 @@
+# utils/sketch.py
+# DDSketch quantile sketch (Masson et al., VLDB 2019): values are counted in logarithmic buckets, so any quantile is
+# returned within `relative_accuracy` of the true value, memory is bounded by the number of buckets (not samples),
+# and two sketches merge exactly by adding their bucket counts. Used for fee percentiles over arbitrary ranges
+# (see utils/fees.py). Values must be >= 0; values below MIN_VALUE go to a zero bucket.
+import math
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 2048
+MIN_VALUE = 1e-30
+
+
+class DDSketch:
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY, max_bins: int = DEFAULT_MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        # dense counts for bucket indices offset .. offset + len(bins) - 1
+        self._bins = np.zeros(0, "int64")
+        self._offset = 0
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    # --- Internal helpers --------------------------------------------------------------------------------------------
+    def _grow(self, lo: int, hi: int) -> None:
+        # make room for bucket indices lo..hi (inclusive)
+        if len(self._bins):
+            lo, hi = min(lo, self._offset), max(hi, self._offset + len(self._bins) - 1)
+        bins = np.zeros(hi - lo + 1, "int64")
+        if len(self._bins):
+            bins[self._offset - lo:self._offset - lo + len(self._bins)] = self._bins
+        self._bins, self._offset = bins, lo
+        self._collapse()
+
+    def _collapse(self) -> None:
+        if len(self._bins) > self.max_bins:
+            # fold the lowest buckets into one: only the smallest quantiles lose accuracy
+            extra = len(self._bins) - self.max_bins
+            self._bins[extra] += self._bins[:extra].sum()
+            self._bins = self._bins[extra:]
+            self._offset += extra
+
+    def _add_indexed(self, index: np.ndarray, counts: Optional[np.ndarray] = None) -> None:
+        if not len(index):
+            return
+        lo, hi = int(index.min()), int(index.max())
+        if not len(self._bins) or lo < self._offset or hi >= self._offset + len(self._bins):
+            self._grow(lo, hi)
+        # indices below the collapsed floor land in the lowest bucket
+        at = np.maximum(index - self._offset, 0)
+        self._bins += np.bincount(at, weights=counts, minlength=len(self._bins)).astype("int64")
+
+    # --- Public API --------------------------------------------------------------------------------------------------
+    def add(self, values: Iterable[float]) -> None:
+        # Vectorized; NaNs are ignored.
+        x = np.asarray(values, dtype="float64").ravel()
+        x = x[~np.isnan(x)]
+        if not len(x):
+            return
+        if (x < 0).any():
+            raise ValueError("DDSketch only accepts values >= 0")
+        self.count += len(x)
+        self.sum += float(x.sum())
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        positive = x[x >= MIN_VALUE]
+        self.zero_count += len(x) - len(positive)
+        self._add_indexed(np.ceil(np.log(positive) / self._log_gamma).astype("int64"))
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        # In place; both sketches must use the same relative accuracy.
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        if not other.count:
+            return self
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero_count += other.zero_count
+        if len(other._bins):
+            nonzero = np.flatnonzero(other._bins)
+            self._add_indexed(nonzero + other._offset, other._bins[nonzero])
+        return self
+
+    def copy(self) -> "DDSketch":
+        return DDSketch(self.relative_accuracy, self.max_bins).merge(self)
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[q]
+
+    def quantiles(self, qs: Sequence[float]) -> Dict[float, Optional[float]]:
+        # One pass over the buckets for all of `qs`.
+        if not self.count:
+            return {q: None for q in qs}
+        if any(not 0 <= q <= 1 for q in qs):
+            raise ValueError(f"quantiles must be in [0, 1], got {list(qs)}")
+        cumulative = np.cumsum(self._bins) + self.zero_count
+        out = {}
+        for q in qs:
+            rank = q * (self.count - 1)
+            if q == 0 or q == 1:
+                # the extremes are tracked exactly
+                out[q] = self.min if q == 0 else self.max
+            elif rank < self.zero_count:
+                out[q] = 0.0
+            else:
+                i = int(np.searchsorted(cumulative, rank, side="right"))
+                value = 2 * self.gamma ** (i + self._offset) / (self.gamma + 1)
+                # the bucket midpoint can overshoot the observed extremes
+                out[q] = min(max(value, self.min), self.max)
+        return out
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    @property
+    def nbytes(self) -> int:
+        return self._bins.nbytes
+
+
+def merge_all(sketches: Iterable[DDSketch], relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY) -> DDSketch:
+    # One dense accumulation over the union of the bucket ranges (instead of one resize + bincount per merge).
+    out = DDSketch(relative_accuracy)
+    sketches = [s for s in sketches if s.count]
+    if not sketches:
+        return out
+    if any(s.gamma != out.gamma for s in sketches):
+        raise ValueError("cannot merge sketches with different relative accuracy")
+    out.count = sum(s.count for s in sketches)
+    out.sum = sum(s.sum for s in sketches)
+    out.min = min(s.min for s in sketches)
+    out.max = max(s.max for s in sketches)
+    out.zero_count = sum(s.zero_count for s in sketches)
+    binned = [s for s in sketches if len(s._bins)]
+    if binned:
+        lo = min(s._offset for s in binned)
+        hi = max(s._offset + len(s._bins) for s in binned)
+        bins = np.zeros(hi - lo, "int64")
+        for s in binned:
+            bins[s._offset - lo:s._offset - lo + len(s._bins)] += s._bins
+        out._bins, out._offset = bins, lo
+        out._collapse()
+    return out
@@ -0,0 +1,173 @@
+# utils/snowflake_analytics.py
+# Historical Ink transaction analytics pushed down to Snowflake: daily tx counts, fees and active addresses over
+# arbitrary date ranges. Results come back as Arrow batches (fetch_pandas_batches) and are cached by
+# (query text, params, data watermark); ranges that end before the watermark never go stale.
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+import pandas as pd
+
+from utils.cache_backend import decode_frame, encode_frame, load_shared
+from utils.fetch import TTLCache
+from utils.snowflake_pool import SnowflakePool
+from utils.streaming import iter_snowflake_batches
+
+WATERMARK_TTL = 5 * 60
+MAX_CACHED_RESULTS = 64
+SHARED_RESULT_TTL = 6 * 3600   # results are keyed by watermark, so this only bounds how long replicas keep them
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*(\.[A-Za-z_][A-Za-z0-9_$]*){0,2}$")
+
+
+def check_identifiers(*identifiers: str) -> None:
+    # Table/column names are interpolated into SQL (they can't be bound), so only plain identifiers are accepted.
+    for identifier in identifiers:
+        if not _IDENTIFIER.match(identifier):
+            raise ValueError(f"Invalid Snowflake identifier: {identifier!r}")
+
+
+@dataclass(frozen=True)
+class TransactionsTable:
+    # Defaults follow the common EVM "core.fact_transactions" layout; override via st.secrets["snowflake"].
+    name: str = "INK.CORE.FACT_TRANSACTIONS"
+    timestamp_col: str = "BLOCK_TIMESTAMP"
+    from_col: str = "FROM_ADDRESS"
+    to_col: str = "TO_ADDRESS"        # only used by the contract graph (utils/contract_graph.py)
+    fee_col: str = "TX_FEE"
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "TransactionsTable":
+        table = cls(
+            name=config.get("transactions_table", cls.name),
+            timestamp_col=config.get("transactions_timestamp_col", cls.timestamp_col),
+            from_col=config.get("transactions_from_col", cls.from_col),
+            to_col=config.get("transactions_to_col", cls.to_col),
+            fee_col=config.get("transactions_fee_col", cls.fee_col),
+        )
+        check_identifiers(table.name, table.timestamp_col, table.from_col, table.to_col, table.fee_col)
+        return table
+
+
+DAILY_ACTIVITY_SQL = """
+SELECT
+    DATE_TRUNC('day', {ts}) AS day,
+    COUNT(*) AS tx_count,
+    SUM({fee}) AS total_fees,
+    AVG({fee}) AS avg_fee,
+    COUNT(DISTINCT {sender}) AS active_addresses
+FROM {table}
+WHERE {ts} >= %(start)s AND {ts} < %(end)s
+GROUP BY 1
+ORDER BY 1
+"""
+
+WATERMARK_SQL = "SELECT MAX({ts}) FROM {table}"
+
+DAILY_COLUMNS = ["day", "tx_count", "total_fees", "avg_fee", "active_addresses"]
+
+
+class TransactionAnalytics:
+    def __init__(self, pool: SnowflakePool, table: TransactionsTable = TransactionsTable()):
+        self.pool = pool
+        self.table = table
+        self._watermarks = TTLCache(default_ttl=WATERMARK_TTL, stale_ttl=WATERMARK_TTL, max_workers=1)
+        self._results: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def _format(self, sql: str) -> str:
+        t = self.table
+        return sql.format(table=t.name, ts=t.timestamp_col, fee=t.fee_col, sender=t.from_col)
+
+    # --- Query execution ---------------------------------------------------------------------------------------------
+    def _query_frame(self, sql: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        # Aggregated results are small (one row per day), so the batches are simply concatenated.
+        batches = list(iter_snowflake_batches(self.pool, sql, params))
+        if not batches:
+            return pd.DataFrame()
+        return pd.concat(batches, ignore_index=True)
+
+    def watermark(self) -> Optional[pd.Timestamp]:
+        # Latest timestamp in the table; refreshed at most every WATERMARK_TTL seconds (stale served meanwhile).
+        def query():
+            df = self._query_frame(self._format(WATERMARK_SQL))
+            value = df.iloc[0, 0] if not df.empty else None
+            return pd.Timestamp(value).isoformat() if value is not None and not pd.isna(value) else None
+
+        def load():
+            # shared with the other replicas (see utils/cache_backend.py); the ISO string round-trips through JSON
+            shared = load_shared(f"snowflake:{self.table.name}:watermark", query, ttl=WATERMARK_TTL)
+            value = pd.Timestamp(shared.value) if shared.value is not None else None
+            return type(shared)(value, shared.fetched_at)
+
+        return self._watermarks.get("watermark", load)
+
+    def cached_query(self, sql: str, params: Dict[str, Any], watermark: Hashable,
+                     prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> pd.DataFrame:
+        # `prepare` (e.g. typing the columns) runs once, before the frame is cached; cached frames are shared by every
+        # caller, so treat them as read-only.
+        key = (sql, tuple(sorted(params.items())), watermark)
+        with self._lock:
+            df = self._results.get(key)
+            if df is not None:
+                self._results.move_to_end(key)
+                self._stats["hits"] += 1
+                return df
+            self._stats["misses"] += 1
+        shared_key = hashlib.sha1(repr(key).encode()).hexdigest()
+        df = load_shared(f"snowflake:{shared_key}", lambda: self._query_frame(sql, params), ttl=SHARED_RESULT_TTL,
+                         encode=encode_frame, decode=decode_frame).value
+        if prepare is not None:
+            df = prepare(df)
+        with self._lock:
+            self._results[key] = df
+            while len(self._results) > MAX_CACHED_RESULTS:
+                self._results.popitem(last=False)
+        return df
+
+    # --- Analytics ---------------------------------------------------------------------------------------------------
+    def daily_activity(self, start: date, end: date) -> pd.DataFrame:
+        # Daily tx count, total/avg fee and active addresses for [start, end] (inclusive dates). Active addresses
+        # are distinct senders: receivers are mostly contracts, which would inflate the count.
+        start_ts = datetime.combine(start, datetime.min.time())
+        end_ts = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        watermark = self.watermark()
+        # a range that closes before the newest data can't change any more: cache it independent of the watermark
+        version = None if watermark is not None and pd.Timestamp(end_ts) <= watermark.tz_localize(None) else watermark
+        return self.cached_query(self._format(DAILY_ACTIVITY_SQL), {"start": start_ts, "end": end_ts}, version,
+                                 prepare=_type_daily)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._results))
+
+
+def _type_daily(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=DAILY_COLUMNS)
+    df = df.copy()   # never modify the frame held by the shared cache
+    df["day"] = pd.to_datetime(df["day"])
+    for col in DAILY_COLUMNS[1:]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+# --- Process-wide instances ------------------------------------------------------------------------------------------
+_instances: Dict[Tuple, TransactionAnalytics] = {}
+_instances_lock = threading.Lock()
+
+
+def get_analytics(pool: SnowflakePool, config: Mapping[str, Any]) -> TransactionAnalytics:
+    table = TransactionsTable.from_config(config)
+    key = (id(pool), table)
+    with _instances_lock:
+        analytics = _instances.get(key)
+        if analytics is None:
+            analytics = TransactionAnalytics(pool, table)
+            _instances[key] = analytics
+    return analytics
@@ -0,0 +1,49 @@
+# utils/streaming.py
+# Chunked readers for result sets that should never be held in memory at once: Dune results paged with
+# limit/offset and Snowflake results as Arrow batches. Consumers take one chunk at a time (e.g. the contracts store
+# appends Dune pages as they arrive), so peak memory is bounded by the page/batch size.
+from typing import Any, Iterable, Iterator, List, Mapping, Optional
+
+import pandas as pd
+
+from utils.tracing import trace
+
+DUNE_PAGE_SIZE = 10_000
+
+
+# --- Sources ---------------------------------------------------------------------------------------------------------
+def iter_dune_pages(url: str, session, page_size: int = DUNE_PAGE_SIZE, timeout: float = 60,
+                    headers: Optional[Mapping[str, str]] = None) -> Iterator[dict]:
+    # Yields raw result pages; every page carries the execution metadata (execution_ended_at, ...), and the
+    # generator stops as soon as Dune reports no next_offset. Pages are only requested as the consumer pulls them.
+    offset = 0
+    while True:
+        with trace("http_fetch", f"{url.split('?')[0]} offset={offset}"):
+            resp = session.get(url, params={"limit": page_size, "offset": offset}, timeout=timeout, headers=headers)
+            resp.raise_for_status()
+        with trace("json_decode", "dune page"):
+            page = resp.json()
+        yield page
+        next_offset = page.get("next_offset")
+        if next_offset is None or not page.get("result", {}).get("rows"):
+            return
+        offset = next_offset
+
+
+def dune_rows(pages: Iterable[dict]) -> Iterator[List[dict]]:
+    for page in pages:
+        yield page.get("result", {}).get("rows", [])
+
+
+def iter_snowflake_batches(pool, sql: str, params: Optional[Mapping[str, Any]] = None) -> Iterator[pd.DataFrame]:
+    # Holds one pooled connection for the lifetime of the generator; close it (or exhaust it) to give it back.
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        try:
+            with trace("snowflake_query", sql.split("FROM")[0].strip()[:60]):
+                cur.execute(sql, dict(params or {}))
+            for batch in cur.fetch_pandas_batches():
+                batch.columns = [c.lower() for c in batch.columns]
+                yield batch
+        finally:
+            cur.close()
@@ -0,0 +1,264 @@
+# utils/timeseries.py
+# Date-keyed store for daily series (e.g. the stats-service `daily_new_transactions` chart). Upstream points are
+# normalized once, when merged in, into two sorted NumPy arrays (day, value). A merge appends the days past the
+# stored tail and patches revised values in place, so a refresh costs O(new points) instead of a full rebuild and
+# re-sort. The full history is kept (the upstream chart only spans 30 days) and persisted under data/series/, and
+# charts and KPI code read cheap window views. The worker and the app processes both merge into the same file, so a
+# merge holds a file lock from re-reading the file to replacing it (utils/file_lock.py).
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.file_lock import file_lock
+from utils.paths import DATA_DIR
+from utils.tracing import traced
+
+SERIES_DIR = DATA_DIR / "series"
+DATE_KEYS = ("date", "date_from")
+CHANGE_LOG_SIZE = 64   # versions a reader can lag behind and still be told which days changed
+
+
+def normalize_chart(chart: Iterable[dict], dtype: str = "float64") -> Tuple[np.ndarray, np.ndarray]:
+    # [{"date" | "date_from" | <first key>: ..., "value" | <second key>: ...}, ...] -> (datetime64[D], dtype) arrays
+    # sorted by day. The keys are detected once per payload, not per point.
+    points = list(chart)
+    if not points:
+        return np.empty(0, "datetime64[D]"), np.empty(0, dtype)
+    keys = list(points[0])
+    date_key = next((k for k in DATE_KEYS if k in points[0]), keys[0])
+    value_key = "value" if "value" in points[0] else keys[1]
+    days = pd.to_datetime([p.get(date_key) for p in points]).values.astype("datetime64[D]")
+    values = pd.to_numeric(pd.Series([p.get(value_key) for p in points]), errors="coerce").fillna(0).to_numpy(dtype)
+    order = np.argsort(days, kind="stable")
+    return days[order], values[order]
+
+
+class DailySeries:
+    def __init__(self, name: str, dtype: str = "float64", path: Optional[Path] = None):
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.path = Path(path) if path is not None else SERIES_DIR / f"{name}.npz"
+        self._lock = threading.Lock()
+        # arrays are over-allocated so appends are amortized O(1); only the first _n slots are live
+        self._days = np.empty(64, "datetime64[D]")
+        self._values = np.empty(64, self.dtype)
+        self._n = 0
+        self._version = 0
+        self._changes: Deque[Tuple[int, np.datetime64]] = deque(maxlen=CHANGE_LOG_SIZE)   # (version, first changed day)
+        self._token: Optional[str] = None
+        self._stat: Optional[Tuple[int, int, int]] = None   # (inode, size, mtime_ns) of the file last read or written
+        self._views: Dict[Any, pd.DataFrame] = {}
+        self._load()
+
+    # --- Persistence -------------------------------------------------------------------------------------------------
+    def _load(self) -> None:
+        # (Re)reads the file when another process (the worker) has rewritten it; every save is a new inode.
+        try:
+            stat = self._stat_key()
+        except FileNotFoundError:
+            return
+        if stat == self._stat:
+            return
+        try:
+            with np.load(self.path) as raw:
+                days, values, token = raw["days"], raw["values"], str(raw["token"])
+        except (FileNotFoundError, ValueError, KeyError, OSError):
+            return
+        days, values = days.astype("datetime64[D]"), values.astype(self.dtype)
+        first = self._first_difference(days, values)
+        self._reserve(len(days))
+        self._days[:len(days)] = days
+        self._values[:len(days)] = values
+        self._n = len(days)
+        self._token = token or None
+        self._stat = stat
+        if first is not None:
+            self._changed(first)
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp.npz")
+        np.savez(tmp, days=self._days[:self._n], values=self._values[:self._n], token=np.str_(self._token or ""))
+        os.replace(tmp, self.path)
+        self._stat = self._stat_key()
+
+    def _stat_key(self) -> Tuple[int, int, int]:
+        stat = self.path.stat()
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    # --- Internal helpers --------------------------------------------------------------------------------------------
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._days):
+            return
+        capacity = max(size, 2 * len(self._days))
+        days = np.empty(capacity, "datetime64[D]")
+        values = np.empty(capacity, self.dtype)
+        days[:self._n] = self._days[:self._n]
+        values[:self._n] = self._values[:self._n]
+        self._days, self._values = days, values
+
+    def _first_difference(self, days: np.ndarray, values: np.ndarray) -> Optional[np.datetime64]:
+        # earliest day at which (days, values) differs from the live arrays; None when identical
+        n = min(self._n, len(days))
+        diff = np.flatnonzero((self._days[:n] != days[:n]) | (self._values[:n] != values[:n]))
+        if len(diff):
+            i = diff[0]
+            return min(self._days[i], days[i])
+        if self._n != len(days):
+            return (self._days if self._n > len(days) else days)[n]
+        return None
+
+    def _changed(self, first_day: np.datetime64) -> None:
+        self._version += 1
+        self._views.clear()
+        self._changes.append((self._version, first_day))
+
+    # --- Writes ------------------------------------------------------------------------------------------------------
+    @traced("dataframe_build")
+    def merge(self, days: np.ndarray, values: np.ndarray, source_token: Optional[str] = None) -> int:
+        # `days` sorted ascending. Days past the stored tail are appended, known days get their value replaced
+        # (the in-progress day is revised on every refresh), unknown days inside the stored range are inserted.
+        # A repeated `source_token` (e.g. the upstream fetch time) is a no-op. Returns the number of points
+        # added or changed.
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, file_lock(self.path.with_suffix(".lock")):
+            # re-read under the lock: another process may have merged since this one last looked
+            self._load()
+            if source_token is not None and str(source_token) == self._token:
+                return 0
+            n = self._n
+            tail = self._days[n - 1] if n else None
+            split = 0 if tail is None else int(np.searchsorted(days, tail, side="right"))
+            changed = 0
+            first_changed = []
+
+            # overlap with the stored history: bounded by the payload size, never by the history length
+            old_days, old_values = days[:split], values[:split].astype(self.dtype)
+            if n and split:
+                idx = np.searchsorted(self._days[:n], old_days)
+                known = (idx < n) & (self._days[np.minimum(idx, n - 1)] == old_days)
+                revised = known.copy()
+                revised[known] = self._values[idx[known]] != old_values[known]
+                self._values[idx[revised]] = old_values[revised]
+                changed += int(revised.sum())
+                if revised.any():
+                    first_changed.append(old_days[revised][0])
+                if not known.all():
+                    # backfilled gap: rare, the only O(history) path
+                    merged_days = np.concatenate([self._days[:n], old_days[~known]])
+                    merged_values = np.concatenate([self._values[:n], old_values[~known]])
+                    order = np.argsort(merged_days, kind="stable")
+                    self._reserve(len(order))
+                    self._days[:len(order)] = merged_days[order]
+                    self._values[:len(order)] = merged_values[order]
+                    self._n = n = len(order)
+                    changed += int((~known).sum())
+                    first_changed.append(old_days[~known][0])
+
+            # new days past the tail: amortized O(1) each
+            new_days, new_values = days[split:], values[split:]
+            if len(new_days):
+                new_days, first = np.unique(new_days, return_index=True)
+                self._reserve(n + len(new_days))
+                self._days[n:n + len(new_days)] = new_days
+                self._values[n:n + len(new_days)] = new_values[first].astype(self.dtype)
+                self._n = n + len(new_days)
+                changed += len(new_days)
+                first_changed.append(new_days[0])
+
+            if source_token is not None:
+                self._token = str(source_token)
+            if changed:
+                self._changed(min(first_changed))
+            if changed or source_token is not None:
+                self._save()
+            return changed
+
+    def merge_chart(self, chart: Iterable[dict], source_token: Optional[str] = None) -> int:
+        with self._lock:
+            self._load()
+            if source_token is not None and str(source_token) == self._token:
+                return 0
+        days, values = normalize_chart(chart, self.dtype.name)
+        return self.merge(days, values, source_token=source_token)
+
+    # --- Reads -------------------------------------------------------------------------------------------------------
+    @property
+    def version(self) -> int:
+        # bumped on every change (including one another process wrote); usable as a figure cache version
+        with self._lock:
+            self._load()
+            return self._version
+
+    def changed_since(self, version: int) -> Optional[pd.Timestamp]:
+        # Earliest day changed after `version` (NaT when nothing did), so a reader that saw `version` can re-read
+        # only from that day on. None when the change log no longer reaches back that far: re-read everything.
+        with self._lock:
+            self._load()
+            if version == self._version:
+                return pd.NaT
+            if not self._changes or version < self._changes[0][0] - 1 or version > self._version:
+                return None
+            return pd.Timestamp(min(day for v, day in self._changes if v > version))
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self._days[self._n - 1]) if self._n else None
+
+    def window(self, days: Optional[int] = None) -> pd.DataFrame:
+        # The last `days` calendar days up to the newest point (None = full history) as a ["date", "value"] frame,
+        # memoized until the next change; a missing day shortens the frame instead of stretching its period.
+        # The frame is shared: read it, don't mutate it.
+        with self._lock:
+            self._load()
+            view = self._views.get(days)
+            if view is None:
+                start = 0
+                if days is not None and self._n:
+                    first_day = self._days[self._n - 1] - np.timedelta64(days - 1, "D")
+                    start = int(np.searchsorted(self._days[:self._n], first_day))
+                view = self._frame(start)
+                self._views[days] = view
+            return view
+
+    def since(self, date: Optional[Any]) -> pd.DataFrame:
+        # Points on or after `date` (all points when None), e.g. to feed a RollingKPIEngine only what it lacks.
+        return self.between(date, None)
+
+    def between(self, start: Optional[Any] = None, end: Optional[Any] = None) -> pd.DataFrame:
+        # Points with start <= date <= end (either bound optional); two binary searches and one slice.
+        with self._lock:
+            self._load()
+            days = self._days[:self._n]
+            lo = 0 if start is None else int(np.searchsorted(days, np.datetime64(pd.Timestamp(start), "D")))
+            hi = self._n if end is None else int(np.searchsorted(days, np.datetime64(pd.Timestamp(end), "D"), "right"))
+            return self._frame(lo, max(lo, hi))
+
+    def _frame(self, start: int, stop: Optional[int] = None) -> pd.DataFrame:
+        stop = self._n if stop is None else stop
+        return pd.DataFrame({
+            "date": self._days[start:stop].astype("datetime64[ns]"),
+            "value": self._values[start:stop].copy(),
+        })
+
+
+# --- Process-wide series ---------------------------------------------------------------------------------------------
+_series: Dict[str, DailySeries] = {}
+_series_lock = threading.Lock()
+
+
+def get_series(name: str, dtype: str = "float64") -> DailySeries:
+    with _series_lock:
+        series = _series.get(name)
+        if series is None:
+            series = DailySeries(name, dtype=dtype)
+            _series[name] = series
+    return series
@@ -0,0 +1,186 @@
+# utils/tracing.py
+# Per-phase timing for the hot paths (HTTP fetch, JSON decode, DataFrame build, KPI compute, figure build,
+# Snowflake connect/query). Spans are grouped per page rerun, aggregated into per-page histograms, and can be
+# exported as Prometheus text or JSONL. Set INK_TRACE_JSONL=<path> to append every finished rerun's spans to a file.
+# Fragment reruns (st.fragment) get their own trace, see traced_fragment.
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:   # the worker (ingest.py) also records spans
+    get_script_run_ctx = None
+
+# histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+RECENT_SPANS = 5000
+BACKGROUND = "(background)"
+
+
+@dataclass
+class Span:
+    page: str
+    phase: str
+    seconds: float
+    started_at: float
+    detail: str = ""
+    fragment: str = ""
+
+
+@dataclass
+class RunTrace:
+    page: str
+    fragment: Optional[str] = None   # set for a fragment rerun
+    started_at: float = field(default_factory=time.time)
+    spans: List[Span] = field(default_factory=list)
+
+    def slowest(self, n: int = 10) -> List[Span]:
+        return sorted(self.spans, key=lambda s: s.seconds, reverse=True)[:n]
+
+    def totals(self) -> Dict[str, float]:
+        out: Dict[str, float] = defaultdict(float)
+        for span in self.spans:
+            out[span.phase] += span.seconds
+        return dict(out)
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.total += seconds
+        self.count += 1
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+
+
+_current: contextvars.ContextVar[Optional[RunTrace]] = contextvars.ContextVar("ink_trace_run", default=None)
+_histograms: Dict[Tuple[str, str], _Histogram] = defaultdict(_Histogram)
+_recent: Deque[Span] = deque(maxlen=RECENT_SPANS)
+_lock = threading.Lock()
+
+
+# --- Recording -------------------------------------------------------------------------------------------------------
+def start_run(page: str) -> RunTrace:
+    # Call once at the top of a page script; spans recorded during this rerun attach to the returned trace.
+    run = RunTrace(page)
+    _current.set(run)
+    return run
+
+
+def finish_run(run: RunTrace) -> None:
+    path = os.environ.get("INK_TRACE_JSONL")
+    if path:
+        with _lock, open(path, "a") as f:
+            for line in jsonl_lines(run.spans):
+                f.write(line + "\n")
+
+
+def _fragment_rerun() -> bool:
+    # True while Streamlit reruns only fragments (run_every, or a widget inside a fragment)
+    ctx = get_script_run_ctx(suppress_warning=True) if get_script_run_ctx is not None else None
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def traced_fragment(page: str):
+    # Put under @st.fragment. A fragment rerun only re-executes the fragment on the session's script thread, where
+    # the last full run's trace is still current; give it a fresh trace instead and export it when the fragment
+    # finishes. During a full rerun the fragment's spans stay in that rerun's trace.
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _fragment_rerun():
+                return fn(*args, **kwargs)
+            run = RunTrace(page, fn.__name__)
+            token = _current.set(run)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _current.reset(token)
+                finish_run(run)
+        return wrapper
+    return decorator
+
+
+def record(phase: str, seconds: float, started_at: Optional[float] = None, detail: str = "") -> None:
+    run = _current.get()
+    page = run.page if run is not None else BACKGROUND
+    span = Span(page, phase, seconds, started_at or time.time() - seconds, detail,
+                (run.fragment or "") if run is not None else "")
+    with _lock:
+        _histograms[(page, phase)].observe(seconds)
+        _recent.append(span)
+        if run is not None:
+            run.spans.append(span)
+
+
+@contextmanager
+def trace(phase: str, detail: str = "") -> Iterator[None]:
+    started_at = time.time()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started, started_at, detail)
+
+
+def traced(phase: str):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with trace(phase, fn.__qualname__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_run() -> Optional[RunTrace]:
+    return _current.get()
+
+
+# --- Export ----------------------------------------------------------------------------------------------------------
+def prometheus_text() -> str:
+    lines = [
+        "# HELP ink_phase_seconds Time spent per dashboard phase.",
+        "# TYPE ink_phase_seconds histogram",
+    ]
+    with _lock:
+        items = sorted((key, (list(h.counts), h.total, h.count)) for key, h in _histograms.items())
+    for (page, phase), (counts, total, count) in items:
+        labels = f'page="{page}",phase="{phase}"'
+        cumulative = 0
+        for bound, n in zip(BUCKETS, counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f'ink_phase_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"ink_phase_seconds_sum{{{labels}}} {total:.6f}")
+        lines.append(f"ink_phase_seconds_count{{{labels}}} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def jsonl_lines(spans: Optional[List[Span]] = None) -> List[str]:
+    if spans is None:
+        with _lock:
+            spans = list(_recent)
+    return [json.dumps({"page": s.page, "phase": s.phase, "seconds": round(s.seconds, 6),
+                        "started_at": s.started_at, "detail": s.detail,
+                        **({"fragment": s.fragment} if s.fragment else {})}) for s in spans]
+
+
+def histogram_summary() -> Dict[Tuple[str, str], Dict[str, float]]:
+    with _lock:
+        return {key: {"count": h.count, "mean": h.total / h.count if h.count else 0.0, "total": h.total}
+                for key, h in _histograms.items()}
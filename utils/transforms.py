@@ -0,0 +1,51 @@
+# utils/transforms.py
+# NumPy-backed share/ratio transforms for the dashboards. Source columns are read as float64 views
+# (no copy of the source frame) and every derived column is written into one preallocated block,
+# so a share computation costs a single (k + 1) x n allocation regardless of how many columns it derives.
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def _column(df: pd.DataFrame, col: str) -> np.ndarray:
+    return df[col].to_numpy(dtype="float64", copy=False)
+
+
+def share_block(df: pd.DataFrame, columns: Sequence[str], zero_total: float = np.nan) -> np.ndarray:
+    # Row 0 holds the total of `columns` (NaN counted as 0), rows 1..k each column's share of that total.
+    # Rows whose total is 0 get `zero_total` instead of a division warning and inf/NaN noise.
+    out = np.empty((len(columns) + 1, len(df)), dtype="float64")
+    total = out[0]
+    total.fill(0.0)
+    for i, col in enumerate(columns, start=1):
+        np.copyto(out[i], _column(df, col))
+        np.nan_to_num(out[i], copy=False, nan=0.0)
+        total += out[i]
+    shares = out[1:]
+    nonzero = total != 0
+    np.divide(shares, total, out=shares, where=nonzero)
+    shares[:, ~nonzero] = zero_total
+    return out
+
+
+def share_frame(df: pd.DataFrame, columns: Sequence[str], names: Optional[Dict[str, str]] = None,
+                keep: Sequence[str] = (), total_name: str = "Total", zero_total: float = np.nan) -> pd.DataFrame:
+    # Frame of `keep` columns (e.g. the date) plus the total and one share column per input column,
+    # named names[col] or "<col> (%)". The derived columns are views into a single block.
+    block = share_block(df, columns, zero_total=zero_total)
+    names = names or {}
+    data = {col: df[col] for col in keep}
+    data[total_name] = block[0]
+    for i, col in enumerate(columns, start=1):
+        data[names.get(col, f"{col} (%)")] = block[i]
+    return pd.DataFrame(data, copy=False)
+
+
+def safe_ratio(numerator, denominator, zero_denominator: float = np.nan) -> np.ndarray:
+    # Element-wise numerator / denominator with `zero_denominator` where the denominator is 0.
+    num = np.asarray(numerator, dtype="float64")
+    den = np.asarray(denominator, dtype="float64")
+    out = np.full(np.broadcast(num, den).shape, zero_denominator, dtype="float64")
+    np.divide(num, den, out=out, where=den != 0)
+    return out